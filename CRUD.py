@@ -2,30 +2,198 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
+import threading
+import weakref
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Tuple, Union
+
+import orjson
+
+
+# Format de stockage des dates des créneaux : largeur fixe, donc l'ordre lexicographique du TEXT
+# est l'ordre chronologique et SQLite compare (et indexe) les colonnes sans conversion.
+DB_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_db_datetime(value: Union[str, datetime]) -> str:
+    """Convertit une date ISO (ou un datetime) au format de stockage DB_DATETIME_FORMAT, en UTC naïf."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime(DB_DATETIME_FORMAT)
+
+
+# Messages levés (RAISE(ABORT, ...)) par les triggers de Creneaux définis dans create_db.py :
+# la règle des 90 minutes est garantie par la base elle-même, de façon atomique.
+CRENEAU_TIME_ORDER_ERROR = "End time must be after start time"
+CRENEAU_OVERLAP_ERROR = "Time slot conflicts with an existing slot. Minimum 90-minute gap required."
+
+
+@lru_cache(maxsize=256)
+def _select_sql(table: str, filter_keys: Tuple[str, ...], columns: Tuple[str, ...], join: Optional[str],
+                order_by: Optional[str] = None, keyset: bool = False, limit: bool = False) -> str:
+    """Construit (une seule fois par forme de requête) le texte SQL d'un SELECT."""
+    cols = ', '.join(columns) if columns else '*'
+    sql = f"SELECT {cols} FROM {table}"     #créé la requete sql de base
+
+    if join:
+        sql += f" {join}"   #ajoute la clause join si elle est présente
+
+    conditions = [f"{key} = ?" for key in filter_keys]
+    if keyset:
+        conditions.append(f"{order_by} > ?")    #pagination par clé : reprend après la dernière valeur vue
+    if conditions:
+        sql += f" WHERE {' AND '.join(conditions)}"   #ajoute la clause where si des filtres sont présents
+
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    if limit:
+        sql += " LIMIT ?"
+    return sql
+
+
+@lru_cache(maxsize=256)
+def _insert_sql(table: str, columns: Tuple[str, ...], returning: bool = False) -> str:
+    """Construit (une seule fois par forme de requête) le texte SQL d'un INSERT."""
+    placeholders = ', '.join(['?'] * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if returning:
+        sql += " RETURNING *"
+    return sql
+
+
+@lru_cache(maxsize=256)
+def _update_sql(table: str, data_keys: Tuple[str, ...], filter_keys: Tuple[str, ...],
+                owner_column: Optional[str] = None, returning: bool = False) -> str:
+    """Construit (une seule fois par forme de requête) le texte SQL d'un UPDATE."""
+    set_placeholders = ', '.join([f"{key} = ?" for key in data_keys])
+    where_placeholders = " AND ".join([f"{key} = ?" for key in filter_keys])
+    sql = f"UPDATE {table} SET {set_placeholders} WHERE {where_placeholders}"   #créé la requete sql de base
+    if owner_column:
+        sql += f" AND (? = 1 OR {owner_column} = ?)"    #restreint au propriétaire sauf utilisateur privilégié
+    if returning:
+        sql += " RETURNING *"
+    return sql
+
+
+@lru_cache(maxsize=256)
+def _delete_sql(table: str, filter_keys: Tuple[str, ...], owner_column: Optional[str] = None) -> str:
+    """Construit (une seule fois par forme de requête) le texte SQL d'un DELETE."""
+    where_placeholders = " AND ".join([f"{key} = ?" for key in filter_keys])
+    sql = f"DELETE FROM {table} WHERE {where_placeholders}"   #créé la requete sql de base
+    if owner_column:
+        sql += f" AND (? = 1 OR {owner_column} = ?)"    #restreint au propriétaire sauf utilisateur privilégié
+    return sql
+
+
+# Recherche d'un utilisateur dans les trois tables en une seule requête.
+# 'rank' conserve l'ordre de vérification historique : Pilote, puis Agent, puis Gestionnaire.
+USER_CREDENTIALS_SQL = """
+    SELECT 1 AS rank, 'pilote' AS type, Id, username, password_hash FROM Pilote WHERE username = ?
+    UNION ALL
+    SELECT 2, 'agent', Id, username, password_hash FROM Agent_d_exploitation WHERE username = ?
+    UNION ALL
+    SELECT 3, 'gestionnaire', Id, username, password_hash FROM Gestionnaire WHERE username = ?
+    ORDER BY rank
+"""
+
+
+# Coût d'un créneau en une seule requête : durée en jours par julianday, tarification dégressive
+# (au mois à partir de 30 jours, à la semaine à partir de 7 jours, sinon à la journée) + avitaillement.
+# Les tarifs viennent soit de la table Infrastructure, soit de valeurs liées (tarifs déjà en cache).
+# Une infrastructure ou un avitaillement absent compte pour 0.
+_CRENEAU_COST_SQL = """
+    SELECT
+        i.prix_jour, i.prix_semaine, i.prix_mois,
+        COALESCE(CASE WHEN t.d >= 30 THEN (t.d / 30.0) * i.prix_mois
+                      WHEN t.d >= 7 THEN (t.d / 7.0) * i.prix_semaine
+                      ELSE t.d * i.prix_jour END, 0)
+        + COALESCE((SELECT cout FROM Avitaillement WHERE Id = ?), 0) AS total
+    FROM (SELECT julianday(?) - julianday(?) AS d) AS t
+    LEFT JOIN {prices} AS i ON 1
+"""
+CRENEAU_COST_SQL = _CRENEAU_COST_SQL.format(
+    prices="(SELECT prix_jour, prix_semaine, prix_mois FROM Infrastructure WHERE Id = ?)")
+CRENEAU_COST_CACHED_PRICES_SQL = _CRENEAU_COST_SQL.format(
+    prices="(SELECT ? AS prix_jour, ? AS prix_semaine, ? AS prix_mois)")
+
+
+class _ThreadConnection:
+    """
+    Connexion persistante d'un thread, rangée dans son threading.local.
+    Quand le thread se termine (ex: worker inactif arrêté par anyio), le threading.local
+    libère cet objet et le finalizer ferme la connexion : pas de fuite de descripteurs.
+    """
+    __slots__ = ("conn", "close", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.close = weakref.finalize(self, conn.close)
+
 
 class DatabaseManager:
     """
     Une classe pour gérer toutes les opérations CRUD sur la base de données SQLite de l'aéroport.
     """
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, persistent: bool = False):
         """
         Initialise le gestionnaire de base de données.
 
         Args:
             db_path (str): Le chemin vers le fichier de la base de données SQLite.
+            persistent (bool, optional): Si True, chaque thread réutilise sa propre connexion au lieu
+                d'en ouvrir une à chaque appel (instance partagée par l'API). Fermer avec close().
         """
         self.db_path = Path(db_path)
         if not self.db_path.exists():
             raise FileNotFoundError(f"La base de données n'a pas été trouvée à l'emplacement : {self.db_path}")
+        self.persistent = persistent
+        self._local = threading.local()
+        # Références faibles uniquement : la connexion d'un thread terminé n'est pas retenue ici
+        self._thread_connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
 
     def _create_connection(self):
-        """Crée et retourne une connexion à la base de données."""
+        """Retourne la connexion du thread courant en mode persistant, sinon une nouvelle connexion."""
+        if not self.persistent:
+            return self._connect()
+        thread_conn = getattr(self._local, "conn", None)
+        if thread_conn is None:
+            # Chaque connexion n'est utilisée que par son thread ; check_same_thread=False
+            # permet de la fermer depuis close() ou depuis le finalizer à la fin du thread
+            conn = self._connect(check_same_thread=False)
+            if conn is None:
+                return None
+            thread_conn = _ThreadConnection(conn)
+            self._local.conn = thread_conn
+            with self._connections_lock:
+                self._thread_connections.add(thread_conn)
+        return thread_conn.conn
+
+    def close(self):
+        """Ferme les connexions persistantes ouvertes par ce gestionnaire."""
+        with self._connections_lock:
+            thread_conns = list(self._thread_connections)
+            self._thread_connections.clear()
+        for thread_conn in thread_conns:
+            thread_conn.close()
+        self._local = threading.local()
+
+    def _connect(self, check_same_thread: bool = True):
+        """Crée et retourne une nouvelle connexion à la base de données."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Le cache de requêtes préparées de sqlite3 évite de re-parser le SQL des chemins chauds
+            conn = sqlite3.connect(self.db_path, cached_statements=256, check_same_thread=check_same_thread)
             # Activer le support des clés étrangères
             conn.execute("PRAGMA foreign_keys = ON;")
+            # WAL : les lectures ne sont plus bloquées par une écriture en cours ;
+            # synchronous=NORMAL suffit en WAL (pas de fsync à chaque commit), cache de 64 Mo
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA cache_size = -65536;")
             # Retourner les lignes comme des dictionnaires
             conn.row_factory = sqlite3.Row
             return conn
@@ -48,9 +216,7 @@ class DatabaseManager:
         Returns:
             Optional[int]: L'ID de la nouvelle ligne insérée, ou None en cas d'erreur.
         """
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['?'] * len(data))
-        sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+        sql = _insert_sql(table, tuple(data))
 
         with self._create_connection() as conn:
             try:
@@ -66,6 +232,39 @@ class DatabaseManager:
                 conn.rollback()
         return None
 
+    def create_returning(self, table: str, data: Dict[str, Any],
+                         raise_integrity_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Crée une nouvelle ligne et la retourne en une seule requête (INSERT ... RETURNING *).
+
+        Args:
+            table (str): Le nom de la table.
+            data (Dict[str, Any]): Un dictionnaire {colonne: valeur}.
+            raise_integrity_errors (bool, optional): Si True, une sqlite3.IntegrityError (contrainte,
+                trigger) est propagée après annulation pour que l'appelant choisisse la réponse.
+
+        Returns:
+            Optional[Dict[str, Any]]: La ligne insérée, ou None en cas d'erreur.
+        """
+        sql = _insert_sql(table, tuple(data), returning=True)
+
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, list(data.values()))
+                row = cursor.fetchone()   # à lire avant le commit
+                conn.commit()
+                return dict(row) if row else None
+            except sqlite3.IntegrityError as e:
+                print(f"Erreur d'intégrité lors de la création : {e}")
+                conn.rollback()
+                if raise_integrity_errors:
+                    raise
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la création : {e}")
+                conn.rollback()
+        return None
+
     def select(self, table: str, filters: Dict[str, Any] = None, columns: List[str] = None, join: str = None) -> List[Dict[str, Any]]:
         """
         Sélectionne des lignes dans une table avec des filtres optionnels.
@@ -79,17 +278,7 @@ class DatabaseManager:
         Returns:
             List[Dict[str, Any]]: Une liste de dictionnaires représentant les lignes trouvées.
         """
-        cols = ', '.join(columns) if columns else '*'
-        sql = f"SELECT {cols} FROM {table}"     #créé la requete sql de base
-        
-        if join:
-            sql += f" {join}"   #ajoute la clause join si elle est présente
-
-        values = []
-        if filters:
-            conditions = " AND ".join([f"{key} = ?" for key in filters.keys()])
-            sql += f" WHERE {conditions}"   #ajoute la clause where si des filtres sont présents
-            values = list(filters.values())
+        sql, values = self._build_select(table, filters, columns, join)
 
         with self._create_connection() as conn:
             try:
@@ -102,6 +291,110 @@ class DatabaseManager:
                 print(f"Erreur lors de la sélection : {e}")
         return []
 
+    def select_json(self, table: str, filters: Dict[str, Any] = None, columns: List[str] = None,
+                    order_by: str = None, after: Any = None, limit: int = None) -> bytes:
+        """
+        Sélectionne des lignes et les encode directement en JSON avec orjson.
+
+        Les noms de colonnes sont lus une seule fois depuis cursor.description,
+        ce qui évite de construire un sqlite3.Row puis un dict Python par ligne.
+
+        Args:
+            table (str): Le nom de la table principale.
+            filters (Dict[str, Any], optional): Dictionnaire de filtres {colonne: valeur}.
+            columns (List[str], optional): Liste des colonnes à retourner. Par défaut, toutes (*).
+            order_by (str, optional): Colonne de tri, utilisée aussi pour la pagination par clé.
+            after (Any, optional): Ne retourne que les lignes dont order_by est strictement supérieur.
+            limit (int, optional): Nombre maximum de lignes retournées.
+
+        Returns:
+            bytes: Un tableau JSON des lignes trouvées (b"[]" en cas d'erreur).
+        """
+        sql, values = self._build_select(table, filters, columns, order_by=order_by, after=after, limit=limit)
+
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.row_factory = None   # tuples bruts, plus rapides que sqlite3.Row
+                cursor.execute(sql, values)
+                cols = [description[0] for description in cursor.description]
+                return orjson.dumps([dict(zip(cols, row)) for row in cursor.fetchall()])
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la sélection JSON : {e}")
+        return b"[]"
+
+    def iter_select(self, table: str, filters: Dict[str, Any] = None, columns: List[str] = None,
+                    order_by: str = None, after: Any = None, limit: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les lignes d'une table une à une, sans charger tout le résultat en mémoire.
+
+        La requête est exécutée (et la première ligne lue) dès l'appel : une erreur d'ouverture ou de
+        requête lève sqlite3.Error avant tout envoi de réponse. La connexion reste ouverte pendant
+        le parcours et est fermée à la fin de l'itérateur.
+
+        Args:
+            table (str): Le nom de la table principale.
+            filters (Dict[str, Any], optional): Dictionnaire de filtres {colonne: valeur}.
+            columns (List[str], optional): Liste des colonnes à retourner. Par défaut, toutes (*).
+            order_by (str, optional): Colonne de tri, utilisée aussi pour la pagination par clé.
+            after (Any, optional): Ne retourne que les lignes dont order_by est strictement supérieur.
+            limit (int, optional): Nombre maximum de lignes retournées.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Un dictionnaire par ligne trouvée.
+
+        Raises:
+            sqlite3.Error: Si la base ne peut pas être ouverte ou si la requête échoue.
+        """
+        sql, values = self._build_select(table, filters, columns, order_by=order_by, after=after, limit=limit)
+
+        # L'itérateur peut être repris depuis un autre thread (StreamingResponse),
+        # la connexion lui est propre donc check_same_thread peut être désactivé
+        conn = self._connect(check_same_thread=False)
+        if conn is None:
+            raise sqlite3.OperationalError(f"Impossible d'ouvrir la base de données : {self.db_path}")
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = None   # tuples bruts, plus rapides que sqlite3.Row
+            cursor.execute(sql, values)
+            cols = [description[0] for description in cursor.description]
+            first_row = cursor.fetchone()
+        except BaseException:
+            conn.close()
+            raise
+        return self._iter_rows(conn, cursor, cols, first_row)
+
+    @staticmethod
+    def _iter_rows(conn: sqlite3.Connection, cursor: sqlite3.Cursor, cols: List[str],
+                   first_row: Optional[tuple]) -> Iterator[Dict[str, Any]]:
+        """
+        Produit les lignes d'une requête déjà exécutée puis ferme la connexion.
+        Une erreur en cours de parcours n'est pas interceptée : la réponse en flux est interrompue
+        au lieu de se terminer par un tableau JSON tronqué mais valide.
+        """
+        try:
+            if first_row is None:
+                return
+            yield dict(zip(cols, first_row))
+            for row in cursor:
+                yield dict(zip(cols, row))
+        finally:
+            conn.close()
+
+    def _build_select(self, table: str, filters: Dict[str, Any] = None, columns: List[str] = None, join: str = None,
+                      order_by: str = None, after: Any = None, limit: int = None) -> Tuple[str, List[Any]]:
+        """Construit la requête SELECT (texte mis en cache) et la liste des valeurs à lier."""
+        filter_keys = tuple(filters) if filters else ()
+        keyset = order_by is not None and after is not None
+        sql = _select_sql(table, filter_keys, tuple(columns) if columns else (), join,
+                          order_by, keyset, limit is not None)
+        values = list(filters.values()) if filters else []
+        if keyset:
+            values.append(after)
+        if limit is not None:
+            values.append(limit)
+        return sql, values
+
     def update(self, table: str, data: Dict[str, Any], filters: Dict[str, Any]) -> int:
         """
         Met à jour une ou plusieurs lignes dans une table.
@@ -114,9 +407,7 @@ class DatabaseManager:
         Returns:
             int: Le nombre de lignes affectées.
         """
-        set_placeholders = ', '.join([f"{key} = ?" for key in data.keys()])
-        where_placeholders = " AND ".join([f"{key} = ?" for key in filters.keys()])
-        sql = f"UPDATE {table} SET {set_placeholders} WHERE {where_placeholders}"   #créé la requete sql de base
+        sql = _update_sql(table, tuple(data), tuple(filters))
         
         values = list(data.values()) + list(filters.values())  #ajoute les valeurs des filtres à la requete sql
         
@@ -131,6 +422,42 @@ class DatabaseManager:
                 conn.rollback()
         return 0
 
+    def update_returning(self, table: str, data: Dict[str, Any], filters: Dict[str, Any],
+                         raise_integrity_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Met à jour une ligne et la retourne en une seule requête (UPDATE ... RETURNING *).
+
+        Args:
+            table (str): Le nom de la table.
+            data (Dict[str, Any]): Dictionnaire des nouvelles données {colonne: nouvelle_valeur}.
+            filters (Dict[str, Any]): Dictionnaire de filtres {colonne: valeur} pour la clause WHERE.
+            raise_integrity_errors (bool, optional): Si True, une sqlite3.IntegrityError (contrainte,
+                trigger) est propagée après annulation pour que l'appelant choisisse la réponse.
+
+        Returns:
+            Optional[Dict[str, Any]]: La ligne mise à jour, ou None si aucune ligne n'a été modifiée.
+        """
+        sql = _update_sql(table, tuple(data), tuple(filters), returning=True)
+
+        values = list(data.values()) + list(filters.values())
+
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, values)
+                row = cursor.fetchone()   # à lire avant le commit
+                conn.commit()
+                return dict(row) if row else None
+            except sqlite3.IntegrityError as e:
+                print(f"Erreur d'intégrité lors de la mise à jour : {e}")
+                conn.rollback()
+                if raise_integrity_errors:
+                    raise
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la mise à jour : {e}")
+                conn.rollback()
+        return None
+
     def delete(self, table: str, filters: Dict[str, Any]) -> int:
         """
         Supprime une ou plusieurs lignes d'une table.
@@ -142,8 +469,7 @@ class DatabaseManager:
         Returns:
             int: Le nombre de lignes supprimées.
         """
-        where_placeholders = " AND ".join([f"{key} = ?" for key in filters.keys()])
-        sql = f"DELETE FROM {table} WHERE {where_placeholders}"   #créé la requete sql de base
+        sql = _delete_sql(table, tuple(filters))
         
         with self._create_connection() as conn:
             try:
@@ -181,6 +507,66 @@ class DatabaseManager:
             full_data = {**unique_key, **data}
             return self.create(table, full_data)
 
+    def update_if_owner(self, table: str, data: Dict[str, Any], filters: Dict[str, Any], owner_id: int,
+                        is_privileged: bool, owner_column: str = "pilote_id") -> Optional[Dict[str, Any]]:
+        """
+        Met à jour une ligne seulement si l'utilisateur en est propriétaire (ou privilégié), en une seule requête.
+
+        Args:
+            table (str): Le nom de la table.
+            data (Dict[str, Any]): Dictionnaire des nouvelles données {colonne: nouvelle_valeur}.
+            filters (Dict[str, Any]): Dictionnaire de filtres {colonne: valeur} pour la clause WHERE.
+            owner_id (int): L'ID de l'utilisateur qui demande la modification.
+            is_privileged (bool): True si l'utilisateur peut modifier sans être propriétaire.
+            owner_column (str, optional): La colonne qui référence le propriétaire.
+
+        Returns:
+            Optional[Dict[str, Any]]: La ligne mise à jour, ou None si aucune ligne n'a été modifiée.
+        """
+        sql = _update_sql(table, tuple(data), tuple(filters), owner_column=owner_column, returning=True)
+
+        values = list(data.values()) + list(filters.values()) + [int(is_privileged), owner_id]
+
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, values)
+                row = cursor.fetchone()
+                conn.commit()
+                return dict(row) if row else None
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la mise à jour : {e}")
+                conn.rollback()
+        return None
+
+    def delete_if_owner(self, table: str, filters: Dict[str, Any], owner_id: int,
+                        is_privileged: bool, owner_column: str = "pilote_id") -> int:
+        """
+        Supprime une ligne seulement si l'utilisateur en est propriétaire (ou privilégié), en une seule requête.
+
+        Args:
+            table (str): Le nom de la table.
+            filters (Dict[str, Any]): Dictionnaire de filtres {colonne: valeur} pour la clause WHERE.
+            owner_id (int): L'ID de l'utilisateur qui demande la suppression.
+            is_privileged (bool): True si l'utilisateur peut supprimer sans être propriétaire.
+            owner_column (str, optional): La colonne qui référence le propriétaire.
+
+        Returns:
+            int: Le nombre de lignes supprimées.
+        """
+        sql = _delete_sql(table, tuple(filters), owner_column=owner_column)
+
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, list(filters.values()) + [int(is_privileged), owner_id])
+                conn.commit()
+                return cursor.rowcount
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la suppression : {e}")
+                conn.rollback()
+        return 0
+
     # ------------------------------------------- 
     # 2. Fonctions Spécifiques Pertinentes
     # ------------------------------------------- 
@@ -200,6 +586,20 @@ class DatabaseManager:
         results = self.select(user_type, filters={'username': username})
         return results[0] if results else None
 
+    def get_user_credentials(self, username: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les identifiants (type, Id, username, password_hash) d'un nom d'utilisateur
+        dans les tables Pilote, Agent_d_exploitation et Gestionnaire, en une seule requête.
+        """
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(USER_CREDENTIALS_SQL, (username, username, username))
+                return [dict(row) for row in cursor.fetchall()]
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la recherche de l'utilisateur : {e}")
+        return []
+
     def get_avions_for_pilote(self, pilote_id: int) -> List[Dict[str, Any]]:
         """Récupère tous les avions associés à un pilote."""
         return self.select('Avion', filters={'pilote_id': pilote_id})
@@ -236,3 +636,34 @@ class DatabaseManager:
     def update_creneau_status(self, creneau_id: int, new_status: str) -> int:
         """Met à jour le statut d'un créneau (ex: 'Planifié' -> 'Terminé')."""
         return self.update('Creneaux', data={'etat': new_status}, filters={'Id': creneau_id})
+
+    def compute_creneau_cost(self, infrastructure_id: Optional[int], avitaillement_id: Optional[int],
+                             debut_prevu: str, fin_prevu: str,
+                             prices: Optional[Tuple[float, float, float]] = None
+                             ) -> Tuple[float, Optional[Tuple[float, float, float]]]:
+        """
+        Calcule en une seule requête le coût d'un créneau : location de l'infrastructure + avitaillement.
+
+        Args:
+            prices: Tarifs (prix_jour, prix_semaine, prix_mois) déjà connus (cache) ; s'ils sont fournis,
+                la table Infrastructure n'est pas lue.
+
+        Returns:
+            (coût total, tarifs de l'infrastructure lus dans la table ou None) pour alimenter le cache.
+        """
+        if prices is not None:
+            sql, params = CRENEAU_COST_CACHED_PRICES_SQL, (avitaillement_id, fin_prevu, debut_prevu, *prices)
+        else:
+            sql, params = CRENEAU_COST_SQL, (avitaillement_id, fin_prevu, debut_prevu, infrastructure_id)
+        with self._create_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, params)
+                row = cursor.fetchone()
+                loaded = None
+                if prices is None and row["prix_jour"] is not None:
+                    loaded = (row["prix_jour"], row["prix_semaine"], row["prix_mois"])
+                return float(row["total"]), loaded
+            except sqlite3.Error as e:
+                print(f"Erreur lors du calcul du coût du créneau : {e}")
+        return 0.0, None
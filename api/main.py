@@ -15,22 +15,21 @@ FONCTIONNALITÉS CLÉS:
 4. CRUD complet pour toutes les entités
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Header
-from typing import Annotated, List, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, status, Header, Request, Response, Query
+from typing import Annotated, Iterable, Iterator, List, Optional, get_args
 from datetime import datetime, timedelta
 
-from CRUD import DatabaseManager
+from CRUD import DatabaseManager, CRENEAU_OVERLAP_ERROR, CRENEAU_TIME_ORDER_ERROR
 from business import (
     authenticate_user,
     hash_password,
     calculate_creneau_cost,
-    validate_creneau_time_slot,
+    invalidate_infra,
+    invalidate_user,
     validate_creneau_state_transition,
     get_user_avions,
-    get_user_creneaux,
-    check_user_owns_avion,
-    check_user_owns_creneau,
-    check_user_access_to_message
+    get_user_creneaux
 )
 from api.models import (
     Carburant, CarburantCreate,
@@ -47,8 +46,11 @@ from api.models import (
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+import orjson
 import os
+import sqlite3
 
 # Modèle Pydantic pour la réponse du token JWT
 class Token(BaseModel):
@@ -87,8 +89,40 @@ def create_user_with_hashed_password(user_data_model) -> dict:
     user_data["password_hash"] = hashed_password
     return user_data
 
+def stream_json_array(rows: Iterable[dict], chunk_size: int = 65536) -> Iterator[bytes]:
+    """Encode les lignes en tableau JSON par morceaux : la réponse n'est jamais entièrement en mémoire"""
+    buffer = bytearray(b"[")
+    separator = b""
+    for row in rows:
+        buffer += separator
+        buffer += orjson.dumps(row)
+        separator = b","
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+def iter_select_or_500(db: DatabaseManager, table: str, **kwargs) -> Iterator[dict]:
+    """Exécute la requête avant de commencer la réponse en flux : une erreur SQLite donne un vrai 500"""
+    try:
+        return db.iter_select(table, **kwargs)
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la sélection : {e}")
+        raise HTTPException(status_code=500, detail="Database error")
+
+DATABASE_URL = "Code_SQlite.db"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ouvre un DatabaseManager partagé au démarrage et ferme ses connexions à l'arrêt"""
+    app.state.db = DatabaseManager(DATABASE_URL, persistent=True)
+    yield
+    app.state.db.close()
+
 # Initialisation de l'application FastAPI
-app = FastAPI(title="API Gestion Aérodrome", version="1.0")
+# orjson sérialise toutes les réponses (y compris celles validées par response_model)
+app = FastAPI(title="API Gestion Aérodrome", version="1.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configuration CORS pour le frontend
 app.add_middleware(
@@ -99,7 +133,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-DATABASE_URL = "Code_SQlite.db"
+async def get_db(request: Request) -> DatabaseManager:
+    """Retourne le DatabaseManager partagé : une connexion SQLite réutilisée par thread de travail"""
+    return request.app.state.db
+
+DbSession = Annotated[DatabaseManager, Depends(get_db)]
+
+# Les endpoints qui accèdent à la base sont des "def" synchrones : FastAPI les exécute
+# dans son pool de threads, la boucle d'événements n'est donc jamais bloquée par sqlite3.
+# Seuls les endpoints sans I/O (RBAC, racine) et le login, qui délègue bcrypt
+# à un pool dédié (business.authenticate_user), restent "async def".
+
+# Pagination par clé des endpoints de liste (WHERE cle > ? ORDER BY cle LIMIT ?), optionnelle :
+# sans limit, toute la table est renvoyée (comportement attendu par les pages HTML du frontend)
+PageLimit = Annotated[Optional[int], Query(ge=1, le=1000)]
+
+# Les endpoints de lecture renvoient directement une Response (select_json, ORJSONResponse,
+# StreamingResponse) : FastAPI ne revalide pas une Response, leur response_model ne sert qu'à
+# la doc OpenAPI. Le schéma est donc appliqué par le SELECT lui-même : seules les colonnes
+# du modèle sont lues (jamais le password_hash), et les champs float sont convertis en REAL
+# (l'affinité de type de SQLite peut stocker 1 au lieu de 1.0 dans une colonne REAL).
+def model_columns(model: type[BaseModel]) -> List[str]:
+    """Liste des colonnes SELECT correspondant aux champs d'un modèle de réponse"""
+    return [
+        f"CAST({name} AS REAL) AS {name}" if float in (field.annotation, *get_args(field.annotation)) else name
+        for name, field in model.model_fields.items()
+    ]
+
+CARBURANT_COLUMNS = model_columns(Carburant)
+INFRASTRUCTURE_COLUMNS = model_columns(Infrastructure)
+PILOTE_COLUMNS = model_columns(Pilote)
+AVION_COLUMNS = model_columns(Avion)
+CRENEAU_COLUMNS = model_columns(Creneau)
+GESTIONNAIRE_COLUMNS = model_columns(Gestionnaire)
+AGENT_COLUMNS = model_columns(AgentExploitation)
+MESSAGERIE_COLUMNS = model_columns(Messagerie)
 
 
 # ============================================================
@@ -155,13 +223,12 @@ async def read_root():
 
 # ⭐ ENDPOINT AUTHENTIFICATION ⭐
 @app.post("/login/", response_model=Token)
-async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: DbSession):
     """
     Authentifie un utilisateur (Pilote/Agent/Gestionnaire) et retourne un JWT.
     Utilise la fonction authenticate_user() de business.py qui vérifie avec bcrypt.
     """
-    db = DatabaseManager(DATABASE_URL)
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -185,47 +252,35 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
 # ENDPOINTS CARBURANT
 # ============================================================
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/carburants/", response_model=List[Carburant])
-async def get_all_carburants():
-    db = DatabaseManager(DATABASE_URL)
-    carburants = db.select("Carburant")
-    return carburants
+def get_all_carburants(db: DbSession, limit: PageLimit = None, after_nom: Optional[str] = None):
+    return Response(content=db.select_json("Carburant", columns=CARBURANT_COLUMNS, order_by="Nom", after=after_nom, limit=limit), media_type="application/json")
 
 @app.get("/carburants/{carburant_nom}", response_model=Carburant)
-async def get_carburant(carburant_nom: str):
-    db = DatabaseManager(DATABASE_URL)
-    carburant = db.select("Carburant", filters={"Nom": carburant_nom})
+def get_carburant(carburant_nom: str, db: DbSession):
+    carburant = db.select("Carburant", filters={"Nom": carburant_nom}, columns=CARBURANT_COLUMNS)
     if not carburant:
         raise HTTPException(status_code=404, detail="Carburant not found")
-    return carburant[0]
+    return ORJSONResponse(carburant[0])
 
 @app.post("/carburants/", response_model=Carburant, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_agent)])
-async def create_carburant(carburant: CarburantCreate):
-    db = DatabaseManager(DATABASE_URL)
-    new_id = db.create("Carburant", data=carburant.model_dump())
-    if new_id is None:
+def create_carburant(carburant: CarburantCreate, db: DbSession):
+    # RETURNING * renvoie la ligne insérée, même pour une clé primaire textuelle ('Nom')
+    created_carburant = db.create_returning("Carburant", data=carburant.model_dump())
+    if created_carburant is None:
         raise HTTPException(status_code=400, detail="Carburant with this name already exists or invalid data")
-    
-    # SQLite often uses the primary key directly for text-based PKs without `lastrowid`
-    # For 'Carburant', 'Nom' is the PK, so we retrieve it directly
-    created_carburant = db.select("Carburant", filters={"Nom": carburant.Nom})
-    if not created_carburant:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created carburant")
-    return created_carburant[0]
+    return created_carburant
 
 @app.put("/carburants/{carburant_nom}", response_model=Carburant, dependencies=[Depends(is_agent)])
-async def update_carburant(carburant_nom: str, updated_data: CarburantCreate):
-    db = DatabaseManager(DATABASE_URL)
-    rows_affected = db.update("Carburant", data=updated_data.model_dump(), filters={"Nom": carburant_nom})
-    if rows_affected == 0:
+def update_carburant(carburant_nom: str, updated_data: CarburantCreate, db: DbSession):
+    updated_carburant = db.update_returning("Carburant", data=updated_data.model_dump(), filters={"Nom": carburant_nom})
+    if updated_carburant is None:
         raise HTTPException(status_code=404, detail="Carburant not found")
-    
-    updated_carburant = db.select("Carburant", filters={"Nom": carburant_nom})
-    return updated_carburant[0]
+    return updated_carburant
 
 @app.delete("/carburants/{carburant_nom}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_agent)])
-async def delete_carburant(carburant_nom: str):
-    db = DatabaseManager(DATABASE_URL)
+def delete_carburant(carburant_nom: str, db: DbSession):
     rows_affected = db.delete("Carburant", filters={"Nom": carburant_nom})
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Carburant not found")
@@ -235,55 +290,47 @@ async def delete_carburant(carburant_nom: str):
 # Pilote Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/pilotes/", response_model=List[Pilote], dependencies=[Depends(is_agent)])
-async def get_all_pilotes():
-    db = DatabaseManager(DATABASE_URL)
-    pilotes = db.select("Pilote")
-    return pilotes
+def get_all_pilotes(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
+    rows = iter_select_or_500(db, "Pilote", columns=PILOTE_COLUMNS, order_by="Id", after=after_id, limit=limit)
+    return StreamingResponse(stream_json_array(rows), media_type="application/json")
 
 @app.get("/pilotes/{pilote_id}", response_model=Pilote)
-async def get_pilote(pilote_id: int, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
+def get_pilote(pilote_id: int, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
     if current_user["type"] not in ["gestionnaire", "agent"] and current_user["id"] != pilote_id:
         raise HTTPException(status_code=403, detail="Not authorized to view this pilot")
-    pilote = db.select("Pilote", filters={"Id": pilote_id})
+    pilote = db.select("Pilote", filters={"Id": pilote_id}, columns=PILOTE_COLUMNS)
     if not pilote:
         raise HTTPException(status_code=404, detail="Pilote not found")
-    return Pilote(**pilote[0])
+    return ORJSONResponse(pilote[0])
 
 @app.post("/pilotes/", response_model=Pilote, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_agent)])
-async def create_pilote(pilote: PiloteCreate):
-    db = DatabaseManager(DATABASE_URL)
+def create_pilote(pilote: PiloteCreate, db: DbSession):
     user_data = create_user_with_hashed_password(pilote)
     
-    new_id = db.create("Pilote", data=user_data)
-    if new_id is None:
+    created_pilote = db.create_returning("Pilote", data=user_data)
+    if created_pilote is None:
         raise HTTPException(status_code=400, detail="Pilote with this username already exists or invalid data")
-    
-    created_pilote = db.select("Pilote", filters={"Id": new_id})
-    if not created_pilote:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created pilote")
-    return created_pilote[0]
+    return created_pilote
 
 @app.put("/pilotes/{pilote_id}", response_model=Pilote)
-async def update_pilote(pilote_id: int, updated_data: PiloteCreate, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
+def update_pilote(pilote_id: int, updated_data: PiloteCreate, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
     if current_user["type"] not in ["gestionnaire"] and current_user["id"] != pilote_id:
         raise HTTPException(status_code=403, detail="Not authorized to update this pilot")
     
     # Exclure le password des mises à jour
     update_dict = updated_data.model_dump(exclude={"password"})
-    rows_affected = db.update("Pilote", data=update_dict, filters={"Id": pilote_id})
-    if rows_affected == 0:
+    updated_pilote = db.update_returning("Pilote", data=update_dict, filters={"Id": pilote_id})
+    invalidate_user("pilote", pilote_id)  # l'ancien username ne doit plus s'authentifier depuis le cache
+    if updated_pilote is None:
         raise HTTPException(status_code=404, detail="Pilote not found")
-    
-    updated_pilote = db.select("Pilote", filters={"Id": pilote_id})
-    return updated_pilote[0]
+    return updated_pilote
 
 @app.delete("/pilotes/{pilote_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_gestionnaire)])
-async def delete_pilote(pilote_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_pilote(pilote_id: int, db: DbSession):
     rows_affected = db.delete("Pilote", filters={"Id": pilote_id})
+    invalidate_user("pilote", pilote_id)
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Pilote not found")
     return
@@ -292,46 +339,37 @@ async def delete_pilote(pilote_id: int):
 # Infrastructure Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/infrastructures/", response_model=List[Infrastructure])
-async def get_all_infrastructures():
-    db = DatabaseManager(DATABASE_URL)
-    infrastructures = db.select("Infrastructure")
-    return infrastructures
+def get_all_infrastructures(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
+    return Response(content=db.select_json("Infrastructure", columns=INFRASTRUCTURE_COLUMNS, order_by="Id", after=after_id, limit=limit), media_type="application/json")
 
 @app.get("/infrastructures/{infra_id}", response_model=Infrastructure)
-async def get_infrastructure(infra_id: int):
-    db = DatabaseManager(DATABASE_URL)
-    infrastructure = db.select("Infrastructure", filters={"Id": infra_id})
+def get_infrastructure(infra_id: int, db: DbSession):
+    infrastructure = db.select("Infrastructure", filters={"Id": infra_id}, columns=INFRASTRUCTURE_COLUMNS)
     if not infrastructure:
         raise HTTPException(status_code=404, detail="Infrastructure not found")
-    return infrastructure[0]
+    return ORJSONResponse(infrastructure[0])
 
 @app.post("/infrastructures/", response_model=Infrastructure, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_gestionnaire)])
-async def create_infrastructure(infrastructure: InfrastructureCreate):
-    db = DatabaseManager(DATABASE_URL)
-    new_id = db.create("Infrastructure", data=infrastructure.model_dump())
-    if new_id is None:
+def create_infrastructure(infrastructure: InfrastructureCreate, db: DbSession):
+    created_infrastructure = db.create_returning("Infrastructure", data=infrastructure.model_dump())
+    if created_infrastructure is None:
         raise HTTPException(status_code=400, detail="Invalid data or creation failed")
-    
-    created_infrastructure = db.select("Infrastructure", filters={"Id": new_id})
-    if not created_infrastructure:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created infrastructure")
-    return created_infrastructure[0]
+    return created_infrastructure
 
 @app.put("/infrastructures/{infra_id}", response_model=Infrastructure, dependencies=[Depends(is_gestionnaire)])
-async def update_infrastructure(infra_id: int, updated_data: InfrastructureCreate):
-    db = DatabaseManager(DATABASE_URL)
-    rows_affected = db.update("Infrastructure", data=updated_data.model_dump(), filters={"Id": infra_id})
-    if rows_affected == 0:
+def update_infrastructure(infra_id: int, updated_data: InfrastructureCreate, db: DbSession):
+    updated_infrastructure = db.update_returning("Infrastructure", data=updated_data.model_dump(), filters={"Id": infra_id})
+    invalidate_infra(infra_id)  # les tarifs en cache ne sont plus à jour
+    if updated_infrastructure is None:
         raise HTTPException(status_code=404, detail="Infrastructure not found")
-    
-    updated_infrastructure = db.select("Infrastructure", filters={"Id": infra_id})
-    return updated_infrastructure[0]
+    return updated_infrastructure
 
 @app.delete("/infrastructures/{infra_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_gestionnaire)])
-async def delete_infrastructure(infra_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_infrastructure(infra_id: int, db: DbSession):
     rows_affected = db.delete("Infrastructure", filters={"Id": infra_id})
+    invalidate_infra(infra_id)
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Infrastructure not found")
     return
@@ -340,111 +378,110 @@ async def delete_infrastructure(infra_id: int):
 # Avion Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/avions/", response_model=List[Avion], dependencies=[Depends(is_agent)])
-async def get_all_avions():
-    db = DatabaseManager(DATABASE_URL)
-    avions = db.select("Avion")
-    return avions
+def get_all_avions(db: DbSession, limit: PageLimit = None, after_immatriculation: Optional[str] = None):
+    return Response(content=db.select_json("Avion", columns=AVION_COLUMNS, order_by="Immatriculation", after=after_immatriculation, limit=limit), media_type="application/json")
 
 @app.get("/avions/{immatriculation}", response_model=Avion)
-async def get_avion(immatriculation: str, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
-    avion = db.select("Avion", filters={"Immatriculation": immatriculation})
+def get_avion(immatriculation: str, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
+    avion = db.select("Avion", filters={"Immatriculation": immatriculation}, columns=AVION_COLUMNS)
     if not avion:
         raise HTTPException(status_code=404, detail="Avion not found")
-    if current_user["type"] not in ["gestionnaire", "agent"] and not check_user_owns_avion(db, current_user["id"], immatriculation):
+    # La ligne est déjà chargée : vérifier la propriété sans relire la table
+    if current_user["type"] not in ["gestionnaire", "agent"] and avion[0]["pilote_id"] != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized to view this avion")
-    return avion[0]
+    return ORJSONResponse(avion[0])
 
 @app.post("/avions/", response_model=Avion, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_pilote)])
-async def create_avion(avion: AvionCreate, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
+def create_avion(avion: AvionCreate, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
     avion_data = avion.model_dump()
     avion_data["pilote_id"] = current_user["id"]
-    new_id = db.create("Avion", data=avion_data)
-    # For text primary keys, new_id might be None even on success, so we check existence
-    created_avion = db.select("Avion", filters={"Immatriculation": avion.Immatriculation})
-    if not created_avion:
+    # RETURNING * renvoie la ligne insérée, même pour une clé primaire textuelle ('Immatriculation')
+    created_avion = db.create_returning("Avion", data=avion_data)
+    if created_avion is None:
         raise HTTPException(status_code=400, detail="Avion with this immatriculation already exists or invalid data")
-    return created_avion[0]
+    return created_avion
 
-@app.put("/avions/{immatriculation}", response_model=Avion)
-async def update_avion(immatriculation: str, updated_data: AvionCreate, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
-    if not db.select("Avion", filters={"Immatriculation": immatriculation}):
-        raise HTTPException(status_code=404, detail="Avion not found")
-    if current_user["type"] not in ["gestionnaire"] and not check_user_owns_avion(db, current_user["id"], immatriculation):
-        raise HTTPException(status_code=403, detail="Not authorized to update this avion")
-    rows_affected = db.update("Avion", data=updated_data.model_dump(exclude_unset=True), filters={"Immatriculation": immatriculation})
-    if rows_affected == 0:
+def raise_avion_write_error(db: DatabaseManager, immatriculation: str, current_user: dict, action: str):
+    """Relit l'avion (uniquement en cas d'échec) pour choisir entre 404, 403 et 400"""
+    avion = db.select("Avion", filters={"Immatriculation": immatriculation}, columns=["pilote_id"])
+    if not avion:
         raise HTTPException(status_code=404, detail="Avion not found")
-    
-    updated_avion = db.select("Avion", filters={"Immatriculation": immatriculation})
-    return updated_avion[0]
+    if current_user["type"] != "gestionnaire" and avion[0]["pilote_id"] != current_user["id"]:
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this avion")
+    raise HTTPException(status_code=400, detail="Invalid data or operation failed")
+
+@app.put("/avions/{immatriculation}", response_model=Avion)
+def update_avion(immatriculation: str, updated_data: AvionCreate, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
+    # Contrôle de propriété et mise à jour en une seule requête (UPDATE ... RETURNING)
+    updated_avion = db.update_if_owner(
+        "Avion",
+        data=updated_data.model_dump(exclude_unset=True),
+        filters={"Immatriculation": immatriculation},
+        owner_id=current_user["id"],
+        is_privileged=current_user["type"] == "gestionnaire"
+    )
+    if updated_avion is None:
+        raise_avion_write_error(db, immatriculation, current_user, "update")
+    return updated_avion
 
 @app.delete("/avions/{immatriculation}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_avion(immatriculation: str, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
-    if not db.select("Avion", filters={"Immatriculation": immatriculation}):
-        raise HTTPException(status_code=404, detail="Avion not found")
-    if current_user["type"] not in ["gestionnaire"] and not check_user_owns_avion(db, current_user["id"], immatriculation):
-        raise HTTPException(status_code=403, detail="Not authorized to delete this avion")
-    rows_affected = db.delete("Avion", filters={"Immatriculation": immatriculation})
+def delete_avion(immatriculation: str, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
+    rows_affected = db.delete_if_owner(
+        "Avion",
+        filters={"Immatriculation": immatriculation},
+        owner_id=current_user["id"],
+        is_privileged=current_user["type"] == "gestionnaire"
+    )
     if rows_affected == 0:
-        raise HTTPException(status_code=404, detail="Avion not found")
+        raise_avion_write_error(db, immatriculation, current_user, "delete")
     return
 
 @app.get("/pilotes/me/avions/", response_model=List[Avion])
-async def get_my_avions(current_user: Annotated[dict, Depends(is_pilote)]):
-    db = DatabaseManager(DATABASE_URL)
+def get_my_avions(current_user: Annotated[dict, Depends(is_pilote)], db: DbSession):
     return get_user_avions(db, current_user["id"])
 
 @app.get("/pilotes/me/creneaux/", response_model=List[Creneau])
-async def get_my_creneaux(current_user: Annotated[dict, Depends(is_pilote)]):
-    db = DatabaseManager(DATABASE_URL)
+def get_my_creneaux(current_user: Annotated[dict, Depends(is_pilote)], db: DbSession):
     return get_user_creneaux(db, current_user["id"])
 
 # ============================================================
 # ⭐ ENDPOINTS CRÉNEAUX - RÈGLE DES 90 MINUTES ⭐
 # ============================================================
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/creneaux/", response_model=List[Creneau], dependencies=[Depends(is_agent)])
-async def get_all_creneaux():
+def get_all_creneaux(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
     """Liste tous les créneaux (Agents et Gestionnaires uniquement)"""
-    db = DatabaseManager(DATABASE_URL)
-    creneaux = db.select("Creneaux")
-    return creneaux
+    rows = iter_select_or_500(db, "Creneaux", columns=CRENEAU_COLUMNS, order_by="Id", after=after_id, limit=limit)
+    return StreamingResponse(stream_json_array(rows), media_type="application/json")
 
 @app.get("/creneaux/{creneau_id}", response_model=Creneau)
-async def get_creneau(creneau_id: int, current_user: Annotated[dict, Depends(get_current_active_user)]):
+def get_creneau(creneau_id: int, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
     """Récupère un créneau (avec vérification de propriété pour les pilotes)"""
-    db = DatabaseManager(DATABASE_URL)
-    creneau = db.select("Creneaux", filters={"Id": creneau_id})
+    creneau = db.select("Creneaux", filters={"Id": creneau_id}, columns=CRENEAU_COLUMNS)
     if not creneau:
         raise HTTPException(status_code=404, detail="Creneau not found")
-    if current_user["type"] not in ["gestionnaire", "agent"] and not check_user_owns_creneau(db, current_user["id"], creneau_id):
+    # La ligne est déjà chargée : vérifier la propriété sans relire la table
+    if current_user["type"] not in ["gestionnaire", "agent"] and creneau[0]["pilote_id"] != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized to view this creneau")
-    return creneau[0]
+    return ORJSONResponse(creneau[0])
+
+def raise_creneau_integrity_error(error: sqlite3.IntegrityError):
+    """Traduit un refus des triggers de Creneaux en 409, toute autre contrainte (clé étrangère...) en 400"""
+    if str(error) in (CRENEAU_OVERLAP_ERROR, CRENEAU_TIME_ORDER_ERROR):
+        raise HTTPException(status_code=409, detail=str(error))
+    raise HTTPException(status_code=400, detail="Invalid data")
 
 @app.post("/creneaux/", response_model=Creneau, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_pilote)])
-async def create_creneau(creneau: CreneauCreate, current_user: Annotated[dict, Depends(get_current_active_user)]):
+def create_creneau(creneau: CreneauCreate, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
     """
     ⭐ CRÉATION DE CRÉNEAU AVEC VALIDATION 90 MINUTES ⭐
-    1. Vérifie qu'il n'y a pas de conflit avec les créneaux existants (+ 90 min de marge)
-    2. Calcule automatiquement le coût total
-    3. Crée le créneau avec l'état "Demandé"
+    1. Calcule automatiquement le coût total
+    2. Crée le créneau avec l'état "Demandé"
+    3. La base refuse l'insertion en cas de conflit avec un créneau existant (+ 90 min de marge)
     """
-    db = DatabaseManager(DATABASE_URL)
-    
-    # ⭐ VALIDATION DE LA RÈGLE DES 90 MINUTES ⭐
-    is_valid, error_msg = validate_creneau_time_slot(
-        db, 
-        creneau.infrastructure_id, 
-        creneau.debut_prevu, 
-        creneau.fin_prevu
-    )
-    if not is_valid:
-        raise HTTPException(status_code=409, detail=error_msg)
     
     # Préparer les données du créneau
     creneau_data = creneau.model_dump()
@@ -460,22 +497,21 @@ async def create_creneau(creneau: CreneauCreate, current_user: Annotated[dict, D
         creneau.fin_prevu
     )
 
-    new_id = db.create("Creneaux", data=creneau_data)
-    if new_id is None:
+    # ⭐ VALIDATION DE LA RÈGLE DES 90 MINUTES ⭐ (trigger SQLite, atomique avec l'insertion)
+    try:
+        created_creneau = db.create_returning("Creneaux", data=creneau_data, raise_integrity_errors=True)
+    except sqlite3.IntegrityError as e:
+        raise_creneau_integrity_error(e)
+    if created_creneau is None:
         raise HTTPException(status_code=400, detail="Invalid data or creation failed")
-    
-    created_creneau = db.select("Creneaux", filters={"Id": new_id})
-    if not created_creneau:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created creneau")
-    return created_creneau[0]
+    return created_creneau
 
 @app.put("/creneaux/{creneau_id}", response_model=Creneau, dependencies=[Depends(is_agent)])
-async def update_creneau(creneau_id: int, updated_data: CreneauCreate):
+def update_creneau(creneau_id: int, updated_data: CreneauCreate, db: DbSession):
     """
     Mise à jour d'un créneau (Agents uniquement).
     Recalcule le coût si les dates ou infrastructures changent.
     """
-    db = DatabaseManager(DATABASE_URL)
     existing_creneau = db.select("Creneaux", filters={"Id": creneau_id})
     if not existing_creneau:
         raise HTTPException(status_code=404, detail="Creneau not found")
@@ -494,16 +530,17 @@ async def update_creneau(creneau_id: int, updated_data: CreneauCreate):
         
         update_data["cout_total"] = calculate_creneau_cost(db, infra_id, avit_id, debut, fin)
 
-    rows_affected = db.update("Creneaux", data=update_data, filters={"Id": creneau_id})
-    if rows_affected == 0:
+    try:
+        updated_creneau = db.update_returning("Creneaux", data=update_data, filters={"Id": creneau_id},
+                                              raise_integrity_errors=True)
+    except sqlite3.IntegrityError as e:
+        raise_creneau_integrity_error(e)
+    if updated_creneau is None:
         raise HTTPException(status_code=404, detail="Creneau not found")
-    
-    updated_creneau = db.select("Creneaux", filters={"Id": creneau_id})
-    return updated_creneau[0]
+    return updated_creneau
 
 @app.delete("/creneaux/{creneau_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_agent)])
-async def delete_creneau(creneau_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_creneau(creneau_id: int, db: DbSession):
     rows_affected = db.delete("Creneaux", filters={"Id": creneau_id})
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Creneau not found")
@@ -513,52 +550,41 @@ async def delete_creneau(creneau_id: int):
 # Gestionnaire Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/gestionnaires/", response_model=List[Gestionnaire], dependencies=[Depends(is_gestionnaire)])
-async def get_all_gestionnaires():
-    db = DatabaseManager(DATABASE_URL)
-    gestionnaires = db.select("Gestionnaire")
-    return gestionnaires
+def get_all_gestionnaires(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
+    return Response(content=db.select_json("Gestionnaire", columns=GESTIONNAIRE_COLUMNS, order_by="Id", after=after_id, limit=limit), media_type="application/json")
 
 @app.get("/gestionnaires/{gestionnaire_id}", response_model=Gestionnaire, dependencies=[Depends(is_gestionnaire)])
-async def get_gestionnaire(gestionnaire_id: int):
-    db = DatabaseManager(DATABASE_URL)
-    gestionnaire = db.select("Gestionnaire", filters={"Id": gestionnaire_id})
+def get_gestionnaire(gestionnaire_id: int, db: DbSession):
+    gestionnaire = db.select("Gestionnaire", filters={"Id": gestionnaire_id}, columns=GESTIONNAIRE_COLUMNS)
     if not gestionnaire:
         raise HTTPException(status_code=404, detail="Gestionnaire not found")
-    return gestionnaire[0]
+    return ORJSONResponse(gestionnaire[0])
 
 @app.post("/gestionnaires/", response_model=Gestionnaire, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_gestionnaire)])
-async def create_gestionnaire(gestionnaire: GestionnaireCreate):
-    db = DatabaseManager(DATABASE_URL)
+def create_gestionnaire(gestionnaire: GestionnaireCreate, db: DbSession):
     user_data = create_user_with_hashed_password(gestionnaire)
 
-    new_id = db.create("Gestionnaire", data=user_data)
-    if new_id is None:
+    created_gestionnaire = db.create_returning("Gestionnaire", data=user_data)
+    if created_gestionnaire is None:
         raise HTTPException(status_code=400, detail="Invalid data or creation failed")
-    
-    created_gestionnaire = db.select("Gestionnaire", filters={"Id": new_id})
-    if not created_gestionnaire:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created gestionnaire")
-    return created_gestionnaire[0]
+    return created_gestionnaire
 
 @app.put("/gestionnaires/{gestionnaire_id}", response_model=Gestionnaire, dependencies=[Depends(is_gestionnaire)])
-async def update_gestionnaire(gestionnaire_id: int, updated_data: GestionnaireCreate):
-    db = DatabaseManager(DATABASE_URL)
+def update_gestionnaire(gestionnaire_id: int, updated_data: GestionnaireCreate, db: DbSession):
     # Exclure le password des mises à jour
     update_dict = updated_data.model_dump(exclude={"password"})
-    rows_affected = db.update("Gestionnaire", data=update_dict, filters={"Id": gestionnaire_id})
-    if rows_affected == 0:
+    updated_gestionnaire = db.update_returning("Gestionnaire", data=update_dict, filters={"Id": gestionnaire_id})
+    invalidate_user("gestionnaire", gestionnaire_id)  # l'ancien username ne doit plus s'authentifier depuis le cache
+    if updated_gestionnaire is None:
         raise HTTPException(status_code=404, detail="Gestionnaire not found")
-    
-    updated_gestionnaire = db.select("Gestionnaire", filters={"Id": gestionnaire_id})
-    if not updated_gestionnaire:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated gestionnaire")
-    return updated_gestionnaire[0]
+    return updated_gestionnaire
 
 @app.delete("/gestionnaires/{gestionnaire_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_gestionnaire)])
-async def delete_gestionnaire(gestionnaire_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_gestionnaire(gestionnaire_id: int, db: DbSession):
     rows_affected = db.delete("Gestionnaire", filters={"Id": gestionnaire_id})
+    invalidate_user("gestionnaire", gestionnaire_id)
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Gestionnaire not found")
     return
@@ -567,52 +593,41 @@ async def delete_gestionnaire(gestionnaire_id: int):
 # Agent_d_exploitation Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/agents/", response_model=List[AgentExploitation], dependencies=[Depends(is_agent)])
-async def get_all_agents():
-    db = DatabaseManager(DATABASE_URL)
-    agents = db.select("Agent_d_exploitation")
-    return agents
+def get_all_agents(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
+    return Response(content=db.select_json("Agent_d_exploitation", columns=AGENT_COLUMNS, order_by="Id", after=after_id, limit=limit), media_type="application/json")
 
 @app.get("/agents/{agent_id}", response_model=AgentExploitation, dependencies=[Depends(is_agent)])
-async def get_agent(agent_id: int):
-    db = DatabaseManager(DATABASE_URL)
-    agent = db.select("Agent_d_exploitation", filters={"Id": agent_id})
+def get_agent(agent_id: int, db: DbSession):
+    agent = db.select("Agent_d_exploitation", filters={"Id": agent_id}, columns=AGENT_COLUMNS)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent d'exploitation not found")
-    return agent[0]
+    return ORJSONResponse(agent[0])
 
 @app.post("/agents/", response_model=AgentExploitation, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_gestionnaire)])
-async def create_agent(agent: AgentExploitationCreate):
-    db = DatabaseManager(DATABASE_URL)
+def create_agent(agent: AgentExploitationCreate, db: DbSession):
     user_data = create_user_with_hashed_password(agent)
 
-    new_id = db.create("Agent_d_exploitation", data=user_data)
-    if new_id is None:
+    created_agent = db.create_returning("Agent_d_exploitation", data=user_data)
+    if created_agent is None:
         raise HTTPException(status_code=400, detail="Invalid data or creation failed")
-    
-    created_agent = db.select("Agent_d_exploitation", filters={"Id": new_id})
-    if not created_agent:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created agent d'exploitation")
-    return created_agent[0]
+    return created_agent
 
 @app.put("/agents/{agent_id}", response_model=AgentExploitation, dependencies=[Depends(is_agent)])
-async def update_agent(agent_id: int, updated_data: AgentExploitationCreate):
-    db = DatabaseManager(DATABASE_URL)
+def update_agent(agent_id: int, updated_data: AgentExploitationCreate, db: DbSession):
     # Exclure le password des mises à jour
     update_dict = updated_data.model_dump(exclude={"password"})
-    rows_affected = db.update("Agent_d_exploitation", data=update_dict, filters={"Id": agent_id})
-    if rows_affected == 0:
+    updated_agent = db.update_returning("Agent_d_exploitation", data=update_dict, filters={"Id": agent_id})
+    invalidate_user("agent", agent_id)  # l'ancien username ne doit plus s'authentifier depuis le cache
+    if updated_agent is None:
         raise HTTPException(status_code=404, detail="Agent d'exploitation not found")
-    
-    updated_agent = db.select("Agent_d_exploitation", filters={"Id": agent_id})
-    if not updated_agent:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated agent d'exploitation")
-    return updated_agent[0]
+    return updated_agent
 
 @app.delete("/agents/{agent_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_gestionnaire)])
-async def delete_agent(agent_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_agent(agent_id: int, db: DbSession):
     rows_affected = db.delete("Agent_d_exploitation", filters={"Id": agent_id})
+    invalidate_user("agent", agent_id)
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Agent d'exploitation not found")
     return
@@ -623,57 +638,49 @@ async def delete_agent(agent_id: int):
 # Messagerie Endpoints
 # -----------------------------------------------------------
 
+# response_model : documentation OpenAPI uniquement, le schéma est appliqué par les colonnes du SELECT
 @app.get("/messageries/", response_model=List[Messagerie], dependencies=[Depends(is_agent)])
-async def get_all_messageries():
-    db = DatabaseManager(DATABASE_URL)
-    messageries = db.select("Messagerie")
-    return messageries
+def get_all_messageries(db: DbSession, limit: PageLimit = None, after_id: Optional[int] = None):
+    return Response(content=db.select_json("Messagerie", columns=MESSAGERIE_COLUMNS, order_by="Id", after=after_id, limit=limit), media_type="application/json")
 
 @app.get("/messageries/{message_id}", response_model=Messagerie)
-async def get_messagerie(message_id: int, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
-    messagerie = db.select("Messagerie", filters={"Id": message_id})
+def get_messagerie(message_id: int, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
+    messagerie = db.select("Messagerie", filters={"Id": message_id}, columns=MESSAGERIE_COLUMNS)
     if not messagerie:
         raise HTTPException(status_code=404, detail="Message not found")
     
-    if current_user["type"] not in ["gestionnaire", "agent"] and not check_user_access_to_message(db, current_user["id"], message_id):
+    # La ligne est déjà chargée : vérifier l'accès (expéditeur ou destinataire) sans relire la table
+    message = messagerie[0]
+    if current_user["type"] not in ["gestionnaire", "agent"] and current_user["id"] not in (message["pilote_id"], message["agent_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to view this message")
         
-    return messagerie[0]
+    return ORJSONResponse(messagerie[0])
 
 @app.post("/messageries/", response_model=Messagerie, status_code=status.HTTP_201_CREATED, dependencies=[Depends(is_pilote)])
-async def create_messagerie(messagerie: MessagerieCreate):
-    db = DatabaseManager(DATABASE_URL)
-    new_id = db.create("Messagerie", data=messagerie.model_dump())
-    if new_id is None:
+def create_messagerie(messagerie: MessagerieCreate, db: DbSession):
+    created_messagerie = db.create_returning("Messagerie", data=messagerie.model_dump())
+    if created_messagerie is None:
         raise HTTPException(status_code=400, detail="Invalid data or creation failed")
-    
-    created_messagerie = db.select("Messagerie", filters={"Id": new_id})
-    if not created_messagerie:
-        raise HTTPException(status_code=500, detail="Failed to retrieve created message")
-    return created_messagerie[0]
+    return created_messagerie
 
 @app.put("/messageries/{message_id}", response_model=Messagerie)
-async def update_messagerie(message_id: int, updated_data: MessagerieCreate, current_user: Annotated[dict, Depends(get_current_active_user)]):
-    db = DatabaseManager(DATABASE_URL)
-    if not db.select("Messagerie", filters={"Id": message_id}):
+def update_messagerie(message_id: int, updated_data: MessagerieCreate, current_user: Annotated[dict, Depends(get_current_active_user)], db: DbSession):
+    messagerie = db.select("Messagerie", filters={"Id": message_id}, columns=["pilote_id", "agent_id"])
+    if not messagerie:
         raise HTTPException(status_code=404, detail="Message not found")
 
-    if current_user["type"] not in ["gestionnaire", "agent"] and not check_user_access_to_message(db, current_user["id"], message_id):
+    # La ligne est déjà chargée : vérifier l'accès (expéditeur ou destinataire) sans relire la table
+    message = messagerie[0]
+    if current_user["type"] not in ["gestionnaire", "agent"] and current_user["id"] not in (message["pilote_id"], message["agent_id"]):
         raise HTTPException(status_code=403, detail="Not authorized to update this message")
 
-    rows_affected = db.update("Messagerie", data=updated_data.model_dump(exclude_unset=True), filters={"Id": message_id})
-    if rows_affected == 0:
+    updated_messagerie = db.update_returning("Messagerie", data=updated_data.model_dump(exclude_unset=True), filters={"Id": message_id})
+    if updated_messagerie is None:
         raise HTTPException(status_code=404, detail="Message not found")
-    
-    updated_messagerie = db.select("Messagerie", filters={"Id": message_id})
-    if not updated_messagerie:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated message")
-    return updated_messagerie[0]
+    return updated_messagerie
 
 @app.delete("/messageries/{message_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(is_gestionnaire)])
-async def delete_messagerie(message_id: int):
-    db = DatabaseManager(DATABASE_URL)
+def delete_messagerie(message_id: int, db: DbSession):
     rows_affected = db.delete("Messagerie", filters={"Id": message_id})
     if rows_affected == 0:
         raise HTTPException(status_code=404, detail="Message not found")
@@ -1,7 +1,11 @@
 # api/models.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional, List
 
+from CRUD import to_db_datetime
+
+# Response models: extra="ignore" drops columns they do not expose (e.g. password_hash from RETURNING *)
+
 # Carburant
 class CarburantBase(BaseModel):
     Nom: str
@@ -12,8 +16,7 @@ class CarburantCreate(CarburantBase):
 
 class Carburant(CarburantBase):
     # No additional fields for the full model, but good to have for consistency
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Infrastructure
 class InfrastructureBase(BaseModel):
@@ -29,8 +32,7 @@ class InfrastructureCreate(InfrastructureBase):
 
 class Infrastructure(InfrastructureBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Pilote
 class PiloteBase(BaseModel):
@@ -47,8 +49,7 @@ class PiloteCreate(PiloteBase):
 
 class Pilote(PiloteBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Avion
 class AvionBase(BaseModel):
@@ -64,8 +65,7 @@ class AvionCreate(AvionBase):
     pass
 
 class Avion(AvionBase):
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Creneaux
 class CreneauBase(BaseModel):
@@ -81,12 +81,17 @@ class CreneauBase(BaseModel):
     infrastructure_id: Optional[int] = None
 
 class CreneauCreate(CreneauBase):
-    pass
+    # Les dates sont stockées au format fixe "YYYY-MM-DD HH:MM:SS" (comparables directement en SQL).
+    # Normalisation des entrées seulement (création et mise à jour) : les réponses (Creneau)
+    # renvoient la valeur stockée telle quelle, même une ancienne date non migrée.
+    @field_validator("debut_prevu", "fin_prevu", "debut_reel", "fin_reel")
+    @classmethod
+    def normalize_datetime(cls, value: Optional[str]) -> Optional[str]:
+        return to_db_datetime(value) if value is not None else None
 
 class Creneau(CreneauBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Gestionnaire
 class GestionnaireBase(BaseModel):
@@ -101,8 +106,7 @@ class GestionnaireCreate(GestionnaireBase):
 
 class Gestionnaire(GestionnaireBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Agent_d_exploitation
 class AgentExploitationBase(BaseModel):
@@ -117,8 +121,7 @@ class AgentExploitationCreate(AgentExploitationBase):
 
 class AgentExploitation(AgentExploitationBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 # Avitaillement
 class AvitaillementBase(BaseModel):
@@ -133,8 +136,7 @@ class AvitaillementCreate(AvitaillementBase):
 
 class Avitaillement(AvitaillementBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
 
 
 
@@ -152,5 +154,4 @@ class MessagerieCreate(MessagerieBase):
 
 class Messagerie(MessagerieBase):
     Id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="ignore")
@@ -7,24 +7,87 @@ No direct SQL queries - only calls to CRUD operations
 
 FONCTIONS PRINCIPALES POUR LA PRÉSENTATION:
 1. authenticate_user() - Authentification multi-rôles
-2. validate_creneau_time_slot() - Règle métier des 90 minutes
+2. Règle métier des 90 minutes - garantie par les triggers de Creneaux (create_db.py)
 3. calculate_creneau_cost() - Calcul automatique de facturation
 4. hash_password() - Sécurité avec bcrypt
 """
 
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import hmac
+import os
+import threading
+import time
 from passlib.context import CryptContext
 
 from CRUD import DatabaseManager
 
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# BCRYPT_ROUNDS : coût bcrypt (2^rounds itérations), 12 par défaut comme passlib.
+# PEPPER_SECRET : secret HMAC optionnel, stocké hors de la base. S'il est défini, le mot de passe
+# est d'abord passé dans HMAC-SHA256 avant bcrypt : une fuite de la base seule ne suffit plus,
+# ce qui permet de baisser le coût bcrypt. Attention : activer (ou changer) le pepper invalide
+# les hash existants (dont ceux de populate_db.py), les comptes doivent être recréés avec add_user.py.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PEPPER_SECRET = os.getenv("PEPPER_SECRET", "").encode()
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Pool dédié aux vérifications bcrypt : le calcul natif libère le GIL,
+# plusieurs connexions simultanées se répartissent donc sur tous les cœurs
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Cache des authentifications réussies : une reconnexion dans la minute ne repaie pas le bcrypt.
+# Clé = sha256(username + "\0" + password), le mot de passe en clair n'est jamais conservé.
+AUTH_CACHE_TTL = 60  # secondes
+AUTH_CACHE_MAXSIZE = 1024
+_auth_cache: Dict[bytes, Tuple[float, Dict[str, Any]]] = {}
+_auth_cache_lock = threading.Lock()
+
+# Cache des tarifs d'infrastructure (prix_jour, prix_semaine, prix_mois), rarement modifiés.
+# Invalidé par les routes qui écrivent dans Infrastructure ; le TTL borne l'obsolescence
+# entre plusieurs processus (workers) qui ne partagent pas ce cache.
+INFRA_CACHE_TTL = 60  # secondes
+INFRA_CACHE_MAXSIZE = 256
+_infra_price_cache: Dict[int, Tuple[float, Tuple[float, float, float]]] = {}
+_infra_price_cache_lock = threading.Lock()
+
+# Valid creneau state transitions (built once, O(1) membership test):
+# - Demandé -> Confirmé, Annulé
+# - Confirmé -> Autorisé, Annulé
+# - Autorisé -> Achevé
+# - Achevé -> (no transitions)
+# - Annulé -> (no transitions)
+VALID_TRANSITIONS = {
+    "Demandé": frozenset({"Confirmé", "Annulé"}),
+    "Confirmé": frozenset({"Autorisé", "Annulé"}),
+    "Autorisé": frozenset({"Achevé"}),
+    "Achevé": frozenset(),
+    "Annulé": frozenset(),
+}
+
+
+def _pepper(password: str) -> str:
+    """
+    Apply the HMAC pepper when PEPPER_SECRET is set.
+    The 64-char hex digest also stays under bcrypt's 72-byte input limit.
+    """
+    if not PEPPER_SECRET:
+        return password
+    return hmac.new(PEPPER_SECRET, password.encode(), hashlib.sha256).hexdigest()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context.verify(_pepper(plain_password), hashed_password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_BCRYPT_POOL, verify_password, plain_password, hashed_password)
 
 
 def hash_password(password: str) -> str:
@@ -32,14 +95,15 @@ def hash_password(password: str) -> str:
     ⭐ SÉCURITÉ BCRYPT ⭐
     Hash un mot de passe avec bcrypt pour stockage sécurisé.
     """
-    return pwd_context.hash(password)
+    return pwd_context.hash(_pepper(password))
 
 
-def authenticate_user(db: DatabaseManager, username: str, password: str) -> Optional[Dict[str, Any]]:
+async def authenticate_user(db: DatabaseManager, username: str, password: str) -> Optional[Dict[str, Any]]:
     """
     ⭐ AUTHENTIFICATION MULTI-RÔLES ⭐
     Vérifie les credentials dans les 3 tables utilisateurs (Pilote, Agent, Gestionnaire)
     Utilise bcrypt pour la vérification sécurisée des mots de passe.
+    Coroutine : la requête SQLite et bcrypt s'exécutent hors de la boucle d'événements.
     
     Args:
         db: Database manager instance
@@ -49,22 +113,62 @@ def authenticate_user(db: DatabaseManager, username: str, password: str) -> Opti
     Returns:
         Dict avec {id, type, name} si authentifié, None sinon
     """
-    # Vérifier dans la table Pilote
-    pilote = db.select("Pilote", filters={"username": username})
-    if pilote and verify_password(password, pilote[0]["password_hash"]):
-        return {"id": pilote[0]["Id"], "type": "pilote", "name": pilote[0]["username"]}
-    
-    # Vérifier dans la table Agent_d_exploitation
-    agent = db.select("Agent_d_exploitation", filters={"username": username})
-    if agent and verify_password(password, agent[0]["password_hash"]):
-        return {"id": agent[0]["Id"], "type": "agent", "name": agent[0]["username"]}
-
-    # Vérifier dans la table Gestionnaire
-    gestionnaire = db.select("Gestionnaire", filters={"username": username})
-    if gestionnaire and verify_password(password, gestionnaire[0]["password_hash"]):
-        return {"id": gestionnaire[0]["Id"], "type": "gestionnaire", "name": gestionnaire[0]["username"]}
+    cache_key = hashlib.sha256(f"{username}\0{password}".encode()).digest()
+    cached = _get_cached_authentication(cache_key)
+    if cached is not None:
+        return cached
+
+    # Une seule requête couvre les 3 tables (Pilote, Agent_d_exploitation, Gestionnaire)
+    user = None
+    candidates = await asyncio.to_thread(db.get_user_credentials, username)
+    for candidate in candidates:
+        if await averify_password(password, candidate["password_hash"]):
+            user = {"id": candidate["Id"], "type": candidate["type"], "name": candidate["username"]}
+            break
+
+    if user is not None:
+        _cache_authentication(cache_key, user)
+    return user
+
+
+def _get_cached_authentication(cache_key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a copy of the cached user for this key, or None if absent or expired."""
+    with _auth_cache_lock:
+        entry = _auth_cache.get(cache_key)
+        if entry is None:
+            return None
+        expiry, user = entry
+        if expiry <= time.monotonic():
+            del _auth_cache[cache_key]
+            return None
+        return dict(user)
+
+
+def _cache_authentication(cache_key: bytes, user: Dict[str, Any]) -> None:
+    """Store a successful authentication, evicting expired then oldest entries when full."""
+    now = time.monotonic()
+    with _auth_cache_lock:
+        if len(_auth_cache) >= AUTH_CACHE_MAXSIZE:
+            for key in [key for key, (expiry, _) in _auth_cache.items() if expiry <= now]:
+                del _auth_cache[key]
+            if len(_auth_cache) >= AUTH_CACHE_MAXSIZE:
+                del _auth_cache[next(iter(_auth_cache))]
+        _auth_cache[cache_key] = (now + AUTH_CACHE_TTL, dict(user))
+
+
+def invalidate_user(user_type: str, user_id: int) -> None:
+    """
+    Drop every cached authentication of a user after their account has been updated or deleted,
+    so that old credentials (e.g. a previous username) stop logging in immediately.
 
-    return None
+    Args:
+        user_type: 'pilote', 'agent' or 'gestionnaire'
+        user_id: ID of the user in its table
+    """
+    with _auth_cache_lock:
+        for key in [key for key, (_, user) in _auth_cache.items()
+                    if user["type"] == user_type and user["id"] == user_id]:
+            del _auth_cache[key]
 
 
 def calculate_creneau_cost(db: DatabaseManager, infrastructure_id: Optional[int], 
@@ -85,100 +189,49 @@ def calculate_creneau_cost(db: DatabaseManager, infrastructure_id: Optional[int]
     Returns:
         Coût total en float
     """
-    total_cost = 0.0
-
-    # Calcul du coût d'infrastructure
-    if infrastructure_id:
-        infra = db.select("Infrastructure", filters={"Id": infrastructure_id})
-        if infra:
-            infra = infra[0]
-            debut = datetime.fromisoformat(debut_prevu)
-            fin = datetime.fromisoformat(fin_prevu)
-            duration = fin - debut
-            hours = duration.total_seconds() / 3600
-            days = hours / 24
-            
-            # Tarification dégressive selon la durée
-            if days >= 30:
-                total_cost += (days / 30) * infra["prix_mois"]
-            elif days >= 7:
-                total_cost += (days / 7) * infra["prix_semaine"]
-            else:
-                total_cost += days * infra["prix_jour"]
-
-    # Ajout du coût d'avitaillement
-    if avitaillement_id:
-        avitaillement = db.select("Avitaillement", filters={"Id": avitaillement_id})
-        if avitaillement:
-            total_cost += avitaillement[0]["cout"]
-
+    if not infrastructure_id and not avitaillement_id:
+        return 0.0
+
+    # Tarifs lus dans le cache quand c'est possible ; la durée, la tarification dégressive
+    # et l'avitaillement sont calculés par SQLite en une seule requête (qui lit aussi les tarifs
+    # de l'infrastructure en cas d'absence du cache)
+    prices = _get_cached_infra_prices(infrastructure_id) if infrastructure_id else None
+    total_cost, loaded_prices = db.compute_creneau_cost(
+        infrastructure_id or None, avitaillement_id or None, debut_prevu, fin_prevu, prices
+    )
+    if loaded_prices is not None:
+        _cache_infra_prices(infrastructure_id, loaded_prices)
     return total_cost
 
 
-def validate_creneau_time_slot(db: DatabaseManager, infrastructure_id: int, 
-                               debut_prevu: str, fin_prevu: str,
-                               exclude_creneau_id: Optional[int] = None) -> tuple[bool, Optional[str]]:
-    """
-    ⭐ RÈGLE MÉTIER PRINCIPALE ⭐
-    Valide qu'un créneau respecte l'intervalle de sécurité de 90 minutes.
-    Cette fonction est au cœur de la logique métier de l'aérodrome.
-    
-    Args:
-        db: Database manager instance
-        infrastructure_id: ID de l'infrastructure
-        debut_prevu: Début du créneau (format ISO)
-        fin_prevu: Fin du créneau (format ISO)
-        exclude_creneau_id: ID à exclure lors des mises à jour
-        
-    Returns:
-        (is_valid: bool, error_message: Optional[str])
-    """
-    debut = datetime.fromisoformat(debut_prevu)
-    fin = datetime.fromisoformat(fin_prevu)
-    
-    # Valider que la fin est après le début
-    if fin <= debut:
-        return False, "End time must be after start time"
-    
-    # Récupérer tous les créneaux pour cette infrastructure
-    all_creneaux = db.select("Creneaux", filters={"infrastructure_id": infrastructure_id})
-    
-    for existing_creneau in all_creneaux:
-        # Ignorer le créneau en cours de mise à jour
-        if exclude_creneau_id and existing_creneau["Id"] == exclude_creneau_id:
-            continue
-            
-        existing_debut = datetime.fromisoformat(existing_creneau["debut_prevu"])
-        existing_fin = datetime.fromisoformat(existing_creneau["fin_prevu"])
-        
-        # ⭐ RÈGLE DES 90 MINUTES - LOGIQUE CORRIGÉE ⭐
-        # Un créneau est valide si:
-        # - Il commence au moins 90 minutes APRÈS la fin d'un créneau existant
-        # - OU il se termine au moins 90 minutes AVANT le début d'un créneau existant
-        
-        # Calculer les intervalles de temps en minutes
-        time_gap_after = (debut - existing_fin).total_seconds() / 60  # Minutes après le créneau existant
-        time_gap_before = (existing_debut - fin).total_seconds() / 60  # Minutes avant le créneau existant
-        
-        # Si les deux gaps sont négatifs (ou < 90), il y a conflit
-        if time_gap_after < 90 and time_gap_before < 90:
-            # Déterminer quel gap est le plus proche pour un message d'erreur informatif
-            closest_gap = max(time_gap_after, time_gap_before)
-            return False, f"Time slot conflicts with existing slot (ID {existing_creneau['Id']}). Minimum 90-minute gap required, found {closest_gap:.0f} minutes."
-    
-    return True, None
+def _get_cached_infra_prices(infrastructure_id: int) -> Optional[Tuple[float, float, float]]:
+    """Return the cached (prix_jour, prix_semaine, prix_mois), or None if absent or expired."""
+    with _infra_price_cache_lock:
+        entry = _infra_price_cache.get(infrastructure_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+
+def _cache_infra_prices(infrastructure_id: int, prices: Tuple[float, float, float]) -> None:
+    """Store the prices of an infrastructure, evicting the oldest entry when full."""
+    with _infra_price_cache_lock:
+        if len(_infra_price_cache) >= INFRA_CACHE_MAXSIZE and infrastructure_id not in _infra_price_cache:
+            del _infra_price_cache[next(iter(_infra_price_cache))]
+        _infra_price_cache[infrastructure_id] = (time.monotonic() + INFRA_CACHE_TTL, prices)
+
+
+def invalidate_infra(infrastructure_id: int) -> None:
+    """Drop the cached prices of an infrastructure after it has been updated or deleted."""
+    with _infra_price_cache_lock:
+        _infra_price_cache.pop(infrastructure_id, None)
 
 
 def validate_creneau_state_transition(current_state: str, new_state: str) -> tuple[bool, Optional[str]]:
     """
     Validate that a state transition is allowed based on business rules.
     
-    Valid transitions:
-    - Demandé -> Confirmé, Annulé
-    - Confirmé -> Autorisé, Annulé
-    - Autorisé -> Achevé
-    - Achevé -> (no transitions)
-    - Annulé -> (no transitions)
+    Valid transitions are listed in VALID_TRANSITIONS.
     
     Args:
         current_state: Current creneau state
@@ -187,23 +240,11 @@ def validate_creneau_state_transition(current_state: str, new_state: str) -> tup
     Returns:
         Tuple of (is_valid: bool, error_message: Optional[str])
     """
-    valid_transitions = {
-        "Demandé": ["Confirmé", "Annulé"],
-        "Confirmé": ["Autorisé", "Annulé"],
-        "Autorisé": ["Achevé"],
-        "Achevé": [],
-        "Annulé": []
-    }
-    
-    # If state hasn't changed, it's valid
-    if new_state == current_state:
+    # If state hasn't changed, it's valid; otherwise check if transition is allowed
+    if new_state == current_state or new_state in VALID_TRANSITIONS.get(current_state, frozenset()):
         return True, None
     
-    # Check if transition is allowed
-    if new_state not in valid_transitions.get(current_state, []):
-        return False, f"Invalid state transition from {current_state} to {new_state}"
-    
-    return True, None
+    return False, f"Invalid state transition from {current_state} to {new_state}"
 
 
 def get_user_avions(db: DatabaseManager, pilote_id: int) -> List[Dict[str, Any]]:
@@ -232,59 +273,3 @@ def get_user_creneaux(db: DatabaseManager, pilote_id: int) -> List[Dict[str, Any
         List of creneau records
     """
     return db.select("Creneaux", filters={"pilote_id": pilote_id})
-
-
-def check_user_owns_avion(db: DatabaseManager, pilote_id: int, immatriculation: str) -> bool:
-    """
-    Check if a pilot owns a specific avion.
-    
-    Args:
-        db: Database manager instance
-        pilote_id: ID of the pilot
-        immatriculation: Aircraft registration number
-        
-    Returns:
-        True if the pilot owns the avion, False otherwise
-    """
-    avion = db.select("Avion", filters={"Immatriculation": immatriculation})
-    if not avion:
-        return False
-    return avion[0].get("pilote_id") == pilote_id
-
-
-def check_user_owns_creneau(db: DatabaseManager, pilote_id: int, creneau_id: int) -> bool:
-    """
-    Check if a pilot owns a specific creneau.
-    
-    Args:
-        db: Database manager instance
-        pilote_id: ID of the pilot
-        creneau_id: ID of the creneau
-        
-    Returns:
-        True if the pilot owns the creneau, False otherwise
-    """
-    creneau = db.select("Creneaux", filters={"Id": creneau_id})
-    if not creneau:
-        return False
-    return creneau[0].get("pilote_id") == pilote_id
-
-
-def check_user_access_to_message(db: DatabaseManager, user_id: int, message_id: int) -> bool:
-    """
-    Check if a user has access to a specific message (as sender or recipient).
-    
-    Args:
-        db: Database manager instance
-        user_id: ID of the user
-        message_id: ID of the message
-        
-    Returns:
-        True if the user has access to the message, False otherwise
-    """
-    message = db.select("Messagerie", filters={"Id": message_id})
-    if not message:
-        return False
-    
-    msg = message[0]
-    return user_id == msg.get("pilote_id") or user_id == msg.get("agent_id")
@@ -1,6 +1,9 @@
+import argparse
 import sqlite3
 from pathlib import Path
 
+from CRUD import CRENEAU_OVERLAP_ERROR, CRENEAU_TIME_ORDER_ERROR
+
 DATABASE_URL = "Code_SQlite.db"
 
 def create_database_schema(db_path: str):
@@ -128,6 +131,41 @@ def create_database_schema(db_path: str):
             );
         """)
 
+        # Index pour la règle des 90 minutes (recherche des créneaux d'une infrastructure par période)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_creneaux_infra_time
+            ON Creneaux (infrastructure_id, debut_prevu, fin_prevu);
+        """)
+
+        # ⭐ RÈGLE DES 90 MINUTES GARANTIE PAR LA BASE ⭐
+        # Les triggers refusent (RAISE ABORT) toute écriture qui inverse début/fin ou qui
+        # rapproche deux créneaux d'une même infrastructure à moins de 90 minutes.
+        # Le test et l'écriture sont atomiques : pas de conflit possible entre deux requêtes.
+        # Une ligne de même Id n'est pas un conflit (réinsertion des données de démo par ON CONFLICT DO NOTHING).
+        overlap_check = """
+            SELECT RAISE(ABORT, '{time_order_error}')
+            WHERE datetime(NEW.fin_prevu) <= datetime(NEW.debut_prevu);
+            SELECT RAISE(ABORT, '{overlap_error}')
+            WHERE EXISTS (
+                SELECT 1 FROM Creneaux
+                WHERE infrastructure_id = NEW.infrastructure_id
+                  AND debut_prevu < datetime(NEW.fin_prevu, '+90 minutes')
+                  AND fin_prevu > datetime(NEW.debut_prevu, '-90 minutes')
+                  {exclude_self}
+            );
+            """
+        cursor.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_creneaux_no_overlap_insert
+            BEFORE INSERT ON Creneaux
+            BEGIN{overlap_check.format(time_order_error=CRENEAU_TIME_ORDER_ERROR,
+                                       overlap_error=CRENEAU_OVERLAP_ERROR, exclude_self="AND Id IS NOT NEW.Id")}END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_creneaux_no_overlap_update
+            BEFORE UPDATE OF debut_prevu, fin_prevu, infrastructure_id ON Creneaux
+            BEGIN{overlap_check.format(time_order_error=CRENEAU_TIME_ORDER_ERROR,
+                                       overlap_error=CRENEAU_OVERLAP_ERROR, exclude_self="AND Id <> OLD.Id")}END;
+        """)
+
         # Table Messagerie
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS Messagerie (
@@ -143,6 +181,22 @@ def create_database_schema(db_path: str):
             );
         """)
 
+        # Index sur les clés étrangères : filtres par propriétaire (pilote_id...) et
+        # ON DELETE CASCADE / SET NULL sans parcourir toute la table enfant.
+        # Les colonnes username sont déjà indexées par leur contrainte UNIQUE.
+        cursor.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_avion_pilote ON Avion (pilote_id);
+            CREATE INDEX IF NOT EXISTS idx_avitaillement_avion ON Avitaillement (avion_id);
+            CREATE INDEX IF NOT EXISTS idx_creneaux_pilote ON Creneaux (pilote_id);
+            CREATE INDEX IF NOT EXISTS idx_creneaux_avion ON Creneaux (avion_id);
+            CREATE INDEX IF NOT EXISTS idx_creneaux_avitaillement ON Creneaux (avitaillement_id);
+            CREATE INDEX IF NOT EXISTS idx_messagerie_pilote ON Messagerie (pilote_id);
+            CREATE INDEX IF NOT EXISTS idx_messagerie_agent ON Messagerie (agent_id);
+        """)
+
+        # Statistiques pour le planificateur de requêtes
+        cursor.execute("ANALYZE;")
+
         conn.commit()
         print(f"Schéma de la base de données créé avec succès dans {db_path}")
 
@@ -152,11 +206,46 @@ def create_database_schema(db_path: str):
         if conn:
             conn.close()
 
-if __name__ == "__main__":
-    # Supprime l'ancienne base de données si elle existe pour s'assurer d'une nouvelle création
-    db_file = Path(DATABASE_URL)
-    if db_file.exists():
-        print(f"Suppression de l'ancienne base de données : {db_file}")
-        db_file.unlink()
+def normalize_creneaux_datetimes(db_path: str):
+    """
+    Migre les dates des créneaux existants au format de stockage fixe "YYYY-MM-DD HH:MM:SS".
 
-    create_database_schema(DATABASE_URL)
\ No newline at end of file
+    Ce format permet à SQLite de comparer les colonnes directement (règle des 90 minutes).
+    Les valeurs que SQLite ne sait pas interpréter sont laissées telles quelles.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        with conn:
+            cursor = conn.execute("""
+                UPDATE Creneaux SET
+                    debut_prevu = COALESCE(datetime(debut_prevu), debut_prevu),
+                    fin_prevu = COALESCE(datetime(fin_prevu), fin_prevu),
+                    debut_reel = COALESCE(datetime(debut_reel), debut_reel),
+                    fin_reel = COALESCE(datetime(fin_reel), fin_reel);
+            """)
+        print(f"{cursor.rowcount} créneau(x) migré(s) vers le format de date normalisé dans {db_path}")
+
+    except sqlite3.Error as e:
+        print(f"Erreur lors de la migration des dates des créneaux : {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crée (ou migre) le schéma de la base de données SQLite.")
+    parser.add_argument("--migrate", action="store_true", help="Met à jour une base existante au lieu de la recréer.")
+    args = parser.parse_args()
+
+    if args.migrate:
+        # Ajoute les objets manquants (index...) et normalise les données sans rien supprimer
+        create_database_schema(DATABASE_URL)
+        normalize_creneaux_datetimes(DATABASE_URL)
+    else:
+        # Supprime l'ancienne base de données si elle existe pour s'assurer d'une nouvelle création
+        db_file = Path(DATABASE_URL)
+        if db_file.exists():
+            print(f"Suppression de l'ancienne base de données : {db_file}")
+            db_file.unlink()
+
+        create_database_schema(DATABASE_URL)
\ No newline at end of file
@@ -2,21 +2,26 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-import os
+from pathlib import Path
+import sys
+
+# Nombre de lignes lues (fetchmany) et écrites sur la sortie standard à la fois
+FETCH_BATCH_SIZE = 4096
 
 def display_full_database(db_path):
     """
     Affiche la structure et le contenu complet d'une base de données SQLite.
     """
-    if not os.path.exists(db_path):
+    db_file = Path(db_path)
+    if not db_file.is_file():
         print(f"Erreur : Le fichier de base de données '{db_path}' n'a pas été trouvé.")
         return
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = sqlite3.connect(db_file)
         cursor = conn.cursor()
 
-        print(f"=== Analyse complète de la base de données : {os.path.basename(db_path)} ===")
+        print(f"=== Analyse complète de la base de données : {db_file.name} ===")
 
         # Obtenir la liste de toutes les tables
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
@@ -54,13 +59,17 @@ def display_full_database(db_path):
             print(" | ".join(column_names))
             print("-+-".join(['-' * len(name) for name in column_names]))
 
-            rows = cursor.fetchall()
-            if not rows:
+            # Format de ligne calculé une fois par table : %s convertit chaque valeur avec str()
+            row_fmt = " | ".join(["%s"] * len(column_names)) + "\n"
+
+            # Lecture par lots : un seul sys.stdout.write par lot au lieu d'un print par ligne
+            cursor.arraysize = FETCH_BATCH_SIZE
+            has_rows = False
+            while rows := cursor.fetchmany():
+                has_rows = True
+                sys.stdout.write("".join([row_fmt % row for row in rows]))
+            if not has_rows:
                 print("(Cette table est vide)")
-            else:
-                for row in rows:
-                    # Convertir chaque élément de la ligne en chaîne de caractères pour l'affichage
-                    print(" | ".join(map(str, row)))
 
     except sqlite3.Error as e:
         print(f"\nErreur SQLite : {e}")
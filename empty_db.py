@@ -20,9 +20,10 @@ def empty_database(db_path):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
-        # Désactiver temporairement les contraintes de clé étrangère
+        # Désactiver les contraintes de clé étrangère pour cette connexion (l'ordre des DELETE
+        # n'a alors plus d'importance). Le PRAGMA ne vaut que pour cette connexion, fermée à la fin.
         cursor.execute("PRAGMA foreign_keys = OFF;")
-        print("Contraintes de clé étrangère désactivées temporairement.")
+        print("Contraintes de clé étrangère désactivées pour cette connexion.")
 
         # Obtenir la liste de toutes les tables utilisateur
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
@@ -34,20 +35,21 @@ def empty_database(db_path):
 
         print("\nDébut de la suppression des données...")
         
+        # Tous les DELETE dans une seule transaction, verrou d'écriture pris dès le début :
+        # un seul COMMIT (une seule synchronisation disque) pour toutes les tables
+        cursor.execute("BEGIN IMMEDIATE;")
+
         # Pour chaque table, supprimer toutes les lignes
         for table_name_tuple in tables:
             table_name = table_name_tuple[0]
-            try:
-                print(f"  - Vidage de la table : {table_name}")
-                cursor.execute(f"DELETE FROM {table_name};")
-                # Optionnel : réinitialiser les séquences auto-incrémentées si nécessaire
-                # Pour sqlite_sequence, on peut supprimer l'entrée de la table
-                cursor.execute(f"DELETE FROM sqlite_sequence WHERE name=?", (table_name,))
+            print(f"  - Vidage de la table : {table_name}")
+            cursor.execute(f"DELETE FROM {table_name};")
 
-            except sqlite3.Error as e:
-                print(f"    Erreur lors du vidage de la table {table_name}: {e}")
+        # Réinitialiser les séquences auto-incrémentées (la table n'existe qu'avec AUTOINCREMENT)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_sequence';")
+        if cursor.fetchone():
+            cursor.execute("DELETE FROM sqlite_sequence;")
 
-        # Valider les modifications
         conn.commit()
         print("\nToutes les tables ont été vidées avec succès.")
 
@@ -58,18 +60,10 @@ def empty_database(db_path):
             print("Transaction annulée.")
 
     finally:
-        # S'assurer de réactiver les clés étrangères et de fermer la connexion
+        # Fermer la connexion (les contraintes de clé étrangère disparaissent avec elle)
         if 'conn' in locals() and conn:
-            try:
-                # Réactiver les contraintes de clé étrangère
-                cursor.execute("PRAGMA foreign_keys = ON;")
-                print("Contraintes de clé étrangère réactivées.")
-                conn.commit()
-            except sqlite3.Error as e:
-                print(f"Erreur lors de la réactivation des clés étrangères : {e}")
-            finally:
-                conn.close()
-                print("Connexion à la base de données fermée.")
+            conn.close()
+            print("Connexion à la base de données fermée.")
 
 
 if __name__ == "__main__":
@@ -2,10 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-import os
+from pathlib import Path
+import sys
+import io
+import csv
 import argparse # Import argparse
+from itertools import groupby
+from operator import itemgetter
 
-def inspect_sqlite_database(db_path, table_name=None, data_filter=None): # Add parameters
+# Nombre de lignes lues (fetchmany) et écrites sur la sortie standard à la fois
+FETCH_BATCH_SIZE = 1000
+
+# Taille maximale projetée en mémoire (mmap) pour la lecture : 256 Mo
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Gabarit d'une ligne du schéma (nom, type, non nul, clé primaire), calculé une seule fois
+SCHEMA_ROW_FMT = "  %-25s %-15s %-10s %-15s"
+
+def inspect_sqlite_database(db_path, table_name=None, where_col=None, where_val=None, conn=None): # Add parameters
     """
     Se connecte à une base de données SQLite et affiche sa structure
     (tables et colonnes) ou les données d'une table spécifique.
@@ -13,100 +27,124 @@ def inspect_sqlite_database(db_path, table_name=None, data_filter=None): # Add p
     Args:
         db_path (str): Le chemin vers le fichier de la base de données SQLite.
         table_name (str, optional): Le nom de la table dont les données doivent être affichées.
-        data_filter (str, optional): Une clause WHERE pour filtrer les données (ex: "id = 1").
+        where_col (str, optional): Colonne sur laquelle filtrer les données (ex: "Id").
+        where_val (str, optional): Valeur recherchée dans where_col, passée en paramètre lié.
+        conn (sqlite3.Connection, optional): Connexion déjà ouverte sur db_path, réutilisée
+            (et laissée ouverte) au lieu d'en ouvrir une nouvelle à chaque appel.
     """
-    if not os.path.exists(db_path):
+    owns_conn = conn is None
+    db_file = Path(db_path)
+    if owns_conn and not db_file.is_file():
         print(f"Erreur : Le fichier de base de données '{db_path}' n'a pas été trouvé.")
         return
 
     try:
-        # Connexion à la base de données
-        conn = sqlite3.connect(db_path)
+        # Connexion à la base de données (sauf si l'appelant fournit la sienne)
+        if owns_conn:
+            conn = sqlite3.connect(db_file)
         cursor = conn.cursor()
+        if owns_conn:
+            # Script de lecture : les pages sont lues via mmap, sans copie par read() dans le cache de SQLite
+            # (réglage propre à la connexion, celle de l'appelant n'est pas modifiée)
+            cursor.execute(f"PRAGMA mmap_size = {MMAP_SIZE};")
 
-        print(f"--- Opération sur la base de données : {os.path.basename(db_path)} ---")
+        print(f"--- Opération sur la base de données : {db_file.name} ---")
 
-        if table_name and data_filter:
-            # Display data for a specific table with a filter
-            query = f"SELECT * FROM {table_name} WHERE {data_filter}"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            if not rows:
-                print(f"\nAucune donnée trouvée dans la table '{table_name}' avec le filtre '{data_filter}'.")
+        if table_name:
+            # Display data for a specific table, optionally filtered on one column
+            # N'accepter que les tables existantes : le nom est ensuite inséré (entre guillemets) dans le SQL
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+            valid_tables = {row[0] for row in cursor.fetchall()}
+            if table_name not in valid_tables:
+                print(f"\nErreur : la table '{table_name}' n'existe pas.")
                 return
 
-            # Get column names
-            col_names = [description[0] for description in cursor.description]
-            print(f"\nDonnées de la table '{table_name}' (filtre: '{data_filter}') :")
-            print("-" * (len(query) + 20)) # A simple separator
-
-            # Print header
-            print(" | ".join(col_names))
-            print(" | ".join(['-' * len(col) for col in col_names]))
-
-            # Print rows
-            for row in rows:
-                print(" | ".join(map(str, row)))
-
-        elif table_name: # If only table_name is provided, show all data in that table
-            query = f"SELECT * FROM {table_name}"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            if not rows:
-                print(f"\nAucune donnée trouvée dans la table '{table_name}'.")
+            query = f'SELECT * FROM "{table_name}"'
+            params = ()
+            filter_label = ""
+            if where_col:
+                # La colonne est validée contre le schéma de la table, la valeur est un paramètre lié :
+                # "col = ?" permet à SQLite d'utiliser un index sur la colonne
+                cursor.execute("SELECT name FROM pragma_table_info(?);", (table_name,))
+                if where_col not in {row[0] for row in cursor.fetchall()}:
+                    print(f"\nErreur : la colonne '{where_col}' n'existe pas dans la table '{table_name}'.")
+                    return
+                query += f' WHERE "{where_col}" = ?'
+                params = (where_val,)
+                filter_label = f"{where_col} = {where_val}"
+
+            cursor.execute(query, params)
+            # Lire seulement la première ligne : le reste est parcouru au fil de l'eau
+            first_row = cursor.fetchone()
+
+            if first_row is None:
+                if filter_label:
+                    print(f"\nAucune donnée trouvée dans la table '{table_name}' avec le filtre '{filter_label}'.")
+                else:
+                    print(f"\nAucune donnée trouvée dans la table '{table_name}'.")
                 return
 
             # Get column names
             col_names = [description[0] for description in cursor.description]
-            print(f"\nDonnées de la table '{table_name}' :")
+            if filter_label:
+                print(f"\nDonnées de la table '{table_name}' (filtre: '{filter_label}') :")
+            else:
+                print(f"\nDonnées de la table '{table_name}' :")
             print("-" * (len(query) + 20)) # A simple separator
 
-            # Print header
-            print(" | ".join(col_names))
-            print(" | ".join(['-' * len(col) for col in col_names]))
+            # Lignes écrites par csv.writer (module C _csv) avec "|" comme séparateur :
+            # les valeurs contenant "|", des guillemets ou un saut de ligne sont entre guillemets
+            buf = io.StringIO()
+            writer = csv.writer(buf, delimiter="|", lineterminator="\n")
 
-            # Print rows
-            for row in rows:
-                print(" | ".join(map(str, row)))
+            # Print header
+            writer.writerow(col_names)
+            writer.writerow(['-' * len(col) for col in col_names])
+
+            # Print rows (streamed from the cursor, never fully loaded in memory)
+            # Lecture par lots de FETCH_BATCH_SIZE lignes : un fetchmany, un writerows
+            # et un seul sys.stdout.write par lot
+            writer.writerow(first_row)
+            cursor.arraysize = FETCH_BATCH_SIZE
+            while rows := cursor.fetchmany():
+                writer.writerows(rows)
+                sys.stdout.write(buf.getvalue())
+                buf.seek(0)
+                buf.truncate()
+            sys.stdout.write(buf.getvalue())
 
         else:
             # Original functionality: display all tables and their schema
-            # Obtenir la liste des tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-
-            if not tables:
-                print("\nLa base de données est vide (aucune table trouvée).")
-                return
-
-            # Pour chaque table, obtenir son schéma
-            for table_name_tuple in tables:
-                table_name = table_name_tuple[0]
-                # Ignorer les tables internes de sqlite
-                if table_name.startswith('sqlite_'):
-                    continue
-                
+            # Une seule requête : chaque table jointe à ses colonnes (pragma_table_info),
+            # tables dans leur ordre de création (rowid de sqlite_master).
+            # Le filtre des tables internes est fait par SQLite ("_" échappé : sinon joker de LIKE)
+            cursor.execute(r"""
+                SELECT m.name, p.name, p.type, p."notnull", p.pk
+                FROM sqlite_master AS m
+                JOIN pragma_table_info(m.name) AS p
+                WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite\_%' ESCAPE '\'
+                ORDER BY m.rowid, p.cid;
+            """)
+
+            # Regrouper les colonnes par table pour l'affichage, au fil de la lecture du curseur
+            has_tables = False
+            for table_name, table_columns in groupby(cursor, key=itemgetter(0)):
+                has_tables = True
                 print(f"\n\n-> Table : {table_name}")
                 print("-" * (12 + len(table_name)))
 
-                # Utiliser PRAGMA pour obtenir les informations de la table
-                cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = cursor.fetchall()
-
                 # Afficher les en-têtes des colonnes
-                print(f"  {'Nom de la colonne':<25} {'Type':<15} {'Non Nul':<10} {'Clé Primaire':<15}")
-                print(f"  {'-'*25:<25} {'-'*15:<15} {'-'*10:<10} {'-'*15:<15}")
+                print(SCHEMA_ROW_FMT % ('Nom de la colonne', 'Type', 'Non Nul', 'Clé Primaire'))
+                print(SCHEMA_ROW_FMT % ('-'*25, '-'*15, '-'*10, '-'*15))
 
                 # Afficher les détails de chaque colonne
-                for col in columns:
-                    # col est un tuple: (cid, name, type, notnull, dflt_value, pk)
-                    col_name = col[1]
-                    col_type = col[2]
-                    is_not_null = "Oui" if col[3] else "Non"
-                    is_pk = "Oui" if col[5] else "Non"
-                    print(f"  {col_name:<25} {col_type:<15} {is_not_null:<10} {is_pk:<15}")
+                sys.stdout.write("".join([
+                    SCHEMA_ROW_FMT % (col_name, col_type, "Oui" if not_null else "Non", "Oui" if pk else "Non") + "\n"
+                    for _, col_name, col_type, not_null, pk in table_columns
+                ]))
+
+            if not has_tables:
+                print("\nLa base de données est vide (aucune table trouvée).")
 
     except sqlite3.Error as e:
         print(f"\nErreur SQLite : {e}")
@@ -115,19 +153,22 @@ def inspect_sqlite_database(db_path, table_name=None, data_filter=None): # Add p
         print(f"\nUne erreur inattendue est survenue : {e}")
 
     finally:
-        # S'assurer de fermer la connexion
-        if 'conn' in locals() and conn:
+        # S'assurer de fermer la connexion ouverte ici (celle de l'appelant reste ouverte)
+        if owns_conn and conn:
             conn.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Inspecte la structure d'une base de données SQLite ou affiche les données d'une table.")
     parser.add_argument("--db", default="Code_SQlite.db", help="Chemin vers le fichier de la base de données SQLite.")
     parser.add_argument("--table", help="Nom de la table à inspecter (pour le schéma ou les données).")
-    parser.add_argument("--filter", help="Clause WHERE pour filtrer les données de la table (ex: 'Id = 1'). Nécessite --table.")
+    parser.add_argument("--where-col", help="Colonne sur laquelle filtrer les données de la table (ex: 'Id'). Nécessite --table et --where-val.")
+    parser.add_argument("--where-val", help="Valeur recherchée dans --where-col (ex: '1').")
     
     args = parser.parse_args()
 
-    if args.filter and not args.table:
-        parser.error("--filter nécessite --table pour être spécifié.")
+    if (args.where_col is None) != (args.where_val is None):
+        parser.error("--where-col et --where-val doivent être spécifiés ensemble.")
+    if args.where_col and not args.table:
+        parser.error("--where-col nécessite --table pour être spécifié.")
 
-    inspect_sqlite_database(args.db, args.table, args.filter)
\ No newline at end of file
+    inspect_sqlite_database(args.db, args.table, args.where_col, args.where_val)
\ No newline at end of file
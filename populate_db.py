@@ -2,102 +2,181 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-from passlib.context import CryptContext
-
-# Initialiser le contexte pour le hachage des mots de passe avec bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def populate_database(db_path):
-    """Remplit la base de données avec des données de démo."""
+from functools import lru_cache
+from itertools import chain
+
+# Hash bcrypt (coût 12) des mots de passe des comptes de démo, calculés une fois pour toutes :
+# le remplissage ne fait plus aucun calcul bcrypt. Pour ajouter ou changer un mot de passe :
+#   python -c "from passlib.context import CryptContext; print(CryptContext(schemes=['bcrypt']).hash('motdepasse'))"
+# Ces hash sont sans pepper : si PEPPER_SECRET est défini, recréer les comptes avec add_user.py.
+SEED_PASSWORD_HASHES = {
+    'password123': '$2b$12$q7Ad9qtglYsQ/EVWZWFz7Owjdf4bUnKFs8aeWla6hObnU726EL/lu',
+    'azerty456': '$2b$12$n7bWYXLD1SRlCMJTLPDjr.nhivDhjFgiLTjJAP153Lqnc2aL0ceee',
+    'Epicier1': '$2b$12$QQEo4Fx3GQk.QLvYXhpNvOpGwmFscPk36EIGwwRZro/mo3vCOmqz.',
+    'pilotpass1': '$2b$12$rqajoYFiiFkBZP0JabwgfucXxfgg1OxRF0Zl98VnmLWgTnvp.7ERi',
+    'pilotpass2': '$2b$12$zvJvHTew2UJF2fXVHBSTaepEejYzbg4H.89J1nJg92SOK7RbEUaV2',
+    'pilotpass3': '$2b$12$TJ3muJH9MyQndl5WPxT9/uVGr3sRAeG4F7Tt4np3f8nIVOKcleo2.',
+    'agentpass1': '$2b$12$0tMBIMpyDUKjHYn33HMkIOh/OVyRs2W4t/1w5zoU32WJXeJCLWzwq',
+    'agentpass2': '$2b$12$bp/fHMVyV5ndeRjg/U.TReW8qsfEz.dvr/nVDIuy5r93MAyL5LybW',
+}
+
+# Taille du cache de requêtes préparées de sqlite3 (128 par défaut)
+STATEMENT_CACHE_SIZE = 256
+
+@lru_cache(maxsize=None)
+def _insert_sql(table, columns, row_count, column_count):
+    """Construit (une seule fois par forme) le INSERT multi-lignes : même texte SQL => requête préparée réutilisée."""
+    row_placeholders = "(" + ", ".join(["?"] * column_count) + ")"
+    values = ", ".join([row_placeholders] * row_count)
+    return f"INSERT INTO {table} ({columns}) VALUES {values} ON CONFLICT DO NOTHING"
+
+def _insert_rows(cursor, table, columns, rows):
+    """
+    Insère toutes les lignes en une seule instruction INSERT ... VALUES (...), (...), ...
+    Les lignes déjà présentes (clé primaire ou UNIQUE) sont ignorées : ON CONFLICT DO NOTHING,
+    qui contrairement à OR IGNORE laisse passer les erreurs NOT NULL / CHECK.
+
+    Args:
+        cursor: Curseur SQLite.
+        table (str): Nom de la table.
+        columns (str): Liste des colonnes, ex: "Id, nom".
+        rows (list[tuple]): Lignes à insérer, une valeur par colonne.
+    """
+    sql = _insert_sql(table, columns, len(rows), len(rows[0]))
+    cursor.execute(sql, list(chain.from_iterable(rows)))
+
+def populate_database(db_path, conn=None):
+    """
+    Remplit la base de données avec des données de démo.
+
+    Args:
+        db_path (str): Chemin vers le fichier de la base de données SQLite.
+        conn (sqlite3.Connection, optional): Connexion déjà ouverte sur db_path, réutilisée
+            (et laissée ouverte) au lieu d'en ouvrir une nouvelle. Elle ne doit pas avoir
+            de transaction en cours.
+    """
+    owns_conn = conn is None
     try:
-        conn = sqlite3.connect(db_path)
+        if owns_conn:
+            conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
         cursor = conn.cursor()
 
-        # --- Table: Carburant ---
-        carburants = [
-            ('AVGAS 100LL', 2.85),
-            ('JET A-1', 1.95),
-            ('MOGAS', 2.10)
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Carburant (Nom, prix_par_l) VALUES (?, ?)", carburants)
-
-        # --- Table: Infrastructure ---
-        infrastructures = [
-            (1, 'Hangar H1-A', 'Hangar', 1, 150.0, 900.0, 3200.0),
-            (2, 'Parking P1-Nord', 'Parking', 1, 50.0, 300.0, 1000.0),
-            (3, 'Parking P2-Sud', 'Parking', 1, 50.0, 300.0, 1000.0),
-            (4, 'Hangar H2-B', 'Hangar', 1, 200.0, 1200.0, 4500.0),
-            (5, 'Zone de maintenance M1', 'Maintenance', 1, 500.0, 3000.0, 10000.0)
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Infrastructure (Id, nom, type, capacite_max, prix_jour, prix_semaine, prix_mois) VALUES (?, ?, ?, ?, ?, ?, ?)", infrastructures)
-
-        # --- Table: Gestionnaire ---
-        gestionnaires = [
-            (1, 'Dupont', 'Jean', '0102030405', 'jean.dupont@airport.com', 'jdupont', pwd_context.hash('password123')),
-            (2, 'Martin', 'Sophie', '0607080910', 'sophie.martin@airport.com', 'smartin', pwd_context.hash('azerty456')),
-            (3, 'Tripier de Laubrière', 'Thibault', '0769145620', 'thibdelaub@outlook.fr', 'thibault.dlb', pwd_context.hash('Epicier1'))
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Gestionnaire (Id, nom, prenom, tel, mail, username, password_hash) VALUES (?, ?, ?, ?, ?, ?, ?)", gestionnaires)
-
-        # --- Table: Pilote ---
-        pilotes = [
-            (1, 'Durand', 'Pierre', '0611223344', 'p.durand@pilot.com', 'pdurand', 'ATPL-123', 'Class 1-2027', pwd_context.hash('pilotpass1')),
-            (2, 'Lefevre', 'Marie', '0655667788', 'm.lefevre@pilot.com', 'mlefevre', 'CPL-456', 'Class 1-2028', pwd_context.hash('pilotpass2')),
-            (3, 'Bernard', 'Luc', '0688776655', 'l.bernard@pilot.com', 'lbernard', 'PPL-789', 'Class 2-2026', pwd_context.hash('pilotpass3')),
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Pilote (Id, nom, prenom, tel, mail, username, license, medical, password_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", pilotes)
-
-        # --- Table: Agent d'exploitation ---
-        agents = [
-            (1, 'Petit', 'Thomas', '0712345678', 't.petit@airport.com', 'tpetit', pwd_context.hash('agentpass1')),
-            (2, 'Robert', 'Alice', '0787654321', 'a.robert@airport.com', 'arobert', pwd_context.hash('agentpass2')),
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Agent_d_exploitation (Id, nom, prenom, tel, mail, username, password_hash) VALUES (?, ?, ?, ?, ?, ?, ?)", agents)
-
-        # --- Table: Avion ---
-        avions = [
-            ('F-GHTY', 'Cessna', '172 Skyhawk', '7.2m', '1111kg', 'AVGAS 100LL', 1),
-            ('F-BPLN', 'Piper', 'PA-28 Archer', '8.2m', '1157kg', 'AVGAS 100LL', 2),
-            ('F-WXYZ', 'Robin', 'DR400', '8.72m', '1100kg', 'AVGAS 100LL', 3),
-            ('F-ABCD', 'Daher', 'TBM 940', '10.6m', '3353kg', 'JET A-1', 1),
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Avion (Immatriculation, marque, modele, dimension, poids, carburant_id, pilote_id) VALUES (?, ?, ?, ?, ?, ?, ?)", avions)
-
-        # --- Table: Avitaillement ---
-        avitaillements = [
-            (1, '2026-01-10', '14:30', 120.5, 343.42, 'F-GHTY'),
-            (2, '2026-01-11', '09:00', 350.0, 682.50, 'F-ABCD'),
-            (3, '2026-01-12', '18:00', 95.0, 270.75, 'F-BPLN')
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Avitaillement (Id, date, heure, quantite_en_l, cout, avion_id) VALUES (?, ?, ?, ?, ?, ?)", avitaillements)
-
-
-
-        # --- Table: Creneaux ---
-        creneaux = [
-            (1, '2026-01-10 14:00', '2026-01-10 15:00', '2026-01-10 14:05', '2026-01-10 14:55', 'Achevé', 343.42 + 50, 1, 1, 2),
-            (2, '2026-01-11 08:30', '2026-01-11 10:00', '2026-01-11 08:45', '2026-01-11 09:50', 'Achevé', 682.50 + 150, 2, 1, 1),
-            (3, '2026-01-20 10:00', '2026-01-20 12:00', None, None, 'Demandé', None, None, 2, 3)
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Creneaux (Id, debut_prevu, fin_prevu, debut_reel, fin_reel, etat, cout_total, avitaillement_id, pilote_id, infrastructure_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", creneaux)
+        if owns_conn:
+            # Réglages pour le chargement (hors transaction, journal_mode ne peut pas changer dedans) :
+            # WAL + synchronous=NORMAL évitent les fsync du journal, tables temporaires en mémoire, cache de 64 Mo.
+            # Seulement sur notre propre connexion : ces PRAGMA restent actifs après l'appel et
+            # executescript validerait (COMMIT) une transaction ouverte par l'appelant.
+            cursor.executescript("""
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                PRAGMA temp_store = MEMORY;
+                PRAGMA cache_size = -65536;
+            """)
+
+        # Toutes les insertions dans une seule transaction explicite :
+        # un seul COMMIT (et une seule synchronisation disque), annulée en bloc en cas d'erreur
+        with conn:
+            # BEGIN explicite : sqlite3 n'ouvre pas de transaction avant un DROP/CREATE INDEX,
+            # les index seraient sinon perdus si une insertion échoue
+            cursor.execute("BEGIN IMMEDIATE;")
+
+            # Supprimer les index secondaires avant les insertions puis les recréer à la fin :
+            # chaque index est construit une seule fois au lieu d'être mis à jour ligne par ligne.
+            # Les index automatiques (sqlite_autoindex_*, contraintes UNIQUE) ne peuvent pas être supprimés.
+            cursor.execute(r"SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite\_%' ESCAPE '\';")
+            secondary_indexes = cursor.fetchall()
+            for index_name, _ in secondary_indexes:
+                cursor.execute(f'DROP INDEX "{index_name}";')
+
+            # --- Table: Carburant ---
+            carburants = [
+                ('AVGAS 100LL', 2.85),
+                ('JET A-1', 1.95),
+                ('MOGAS', 2.10)
+            ]
+            _insert_rows(cursor, "Carburant", "Nom, prix_par_l", carburants)
+
+            # --- Table: Infrastructure ---
+            infrastructures = [
+                (1, 'Hangar H1-A', 'Hangar', 1, 150.0, 900.0, 3200.0),
+                (2, 'Parking P1-Nord', 'Parking', 1, 50.0, 300.0, 1000.0),
+                (3, 'Parking P2-Sud', 'Parking', 1, 50.0, 300.0, 1000.0),
+                (4, 'Hangar H2-B', 'Hangar', 1, 200.0, 1200.0, 4500.0),
+                (5, 'Zone de maintenance M1', 'Maintenance', 1, 500.0, 3000.0, 10000.0)
+            ]
+            _insert_rows(cursor, "Infrastructure", "Id, nom, type, capacite_max, prix_jour, prix_semaine, prix_mois", infrastructures)
+
+            # --- Table: Gestionnaire ---
+            gestionnaires = [
+                (1, 'Dupont', 'Jean', '0102030405', 'jean.dupont@airport.com', 'jdupont', SEED_PASSWORD_HASHES['password123']),
+                (2, 'Martin', 'Sophie', '0607080910', 'sophie.martin@airport.com', 'smartin', SEED_PASSWORD_HASHES['azerty456']),
+                (3, 'Tripier de Laubrière', 'Thibault', '0769145620', 'thibdelaub@outlook.fr', 'thibault.dlb', SEED_PASSWORD_HASHES['Epicier1'])
+            ]
+            _insert_rows(cursor, "Gestionnaire", "Id, nom, prenom, tel, mail, username, password_hash", gestionnaires)
+
+            # --- Table: Pilote ---
+            pilotes = [
+                (1, 'Durand', 'Pierre', '0611223344', 'p.durand@pilot.com', 'pdurand', 'ATPL-123', 'Class 1-2027', SEED_PASSWORD_HASHES['pilotpass1']),
+                (2, 'Lefevre', 'Marie', '0655667788', 'm.lefevre@pilot.com', 'mlefevre', 'CPL-456', 'Class 1-2028', SEED_PASSWORD_HASHES['pilotpass2']),
+                (3, 'Bernard', 'Luc', '0688776655', 'l.bernard@pilot.com', 'lbernard', 'PPL-789', 'Class 2-2026', SEED_PASSWORD_HASHES['pilotpass3']),
+            ]
+            _insert_rows(cursor, "Pilote", "Id, nom, prenom, tel, mail, username, license, medical, password_hash", pilotes)
+
+            # --- Table: Agent d'exploitation ---
+            agents = [
+                (1, 'Petit', 'Thomas', '0712345678', 't.petit@airport.com', 'tpetit', SEED_PASSWORD_HASHES['agentpass1']),
+                (2, 'Robert', 'Alice', '0787654321', 'a.robert@airport.com', 'arobert', SEED_PASSWORD_HASHES['agentpass2']),
+            ]
+            _insert_rows(cursor, "Agent_d_exploitation", "Id, nom, prenom, tel, mail, username, password_hash", agents)
+
+            # --- Table: Avion ---
+            avions = [
+                ('F-GHTY', 'Cessna', '172 Skyhawk', '7.2m', '1111kg', 'AVGAS 100LL', 1),
+                ('F-BPLN', 'Piper', 'PA-28 Archer', '8.2m', '1157kg', 'AVGAS 100LL', 2),
+                ('F-WXYZ', 'Robin', 'DR400', '8.72m', '1100kg', 'AVGAS 100LL', 3),
+                ('F-ABCD', 'Daher', 'TBM 940', '10.6m', '3353kg', 'JET A-1', 1),
+            ]
+            _insert_rows(cursor, "Avion", "Immatriculation, marque, modele, dimension, poids, carburant_id, pilote_id", avions)
+
+            # --- Table: Avitaillement ---
+            avitaillements = [
+                (1, '2026-01-10', '14:30', 120.5, 343.42, 'F-GHTY'),
+                (2, '2026-01-11', '09:00', 350.0, 682.50, 'F-ABCD'),
+                (3, '2026-01-12', '18:00', 95.0, 270.75, 'F-BPLN')
+            ]
+            _insert_rows(cursor, "Avitaillement", "Id, date, heure, quantite_en_l, cout, avion_id", avitaillements)
+
+
+
+            # --- Table: Creneaux ---
+            creneaux = [
+                (1, '2026-01-10 14:00:00', '2026-01-10 15:00:00', '2026-01-10 14:05:00', '2026-01-10 14:55:00', 'Achevé', 343.42 + 50, 1, 1, 2),
+                (2, '2026-01-11 08:30:00', '2026-01-11 10:00:00', '2026-01-11 08:45:00', '2026-01-11 09:50:00', 'Achevé', 682.50 + 150, 2, 1, 1),
+                (3, '2026-01-20 10:00:00', '2026-01-20 12:00:00', None, None, 'Demandé', None, None, 2, 3)
+            ]
+            _insert_rows(cursor, "Creneaux", "Id, debut_prevu, fin_prevu, debut_reel, fin_reel, etat, cout_total, avitaillement_id, pilote_id, infrastructure_id", creneaux)
         
-        # --- Table: Messagerie ---
-        messages = [
-            (1, '2026-01-09', '11:25', 'Bonjour, je confirme ma réservation pour le 10.', 1, 1, 1),
-            (2, '2026-01-09', '11:30', 'Bien reçu, votre hangar est réservé.', 0, 1, 1)
-        ]
-        cursor.executemany("INSERT OR IGNORE INTO Messagerie (Id, date, heure, contenu, sens_d_envoie, agent_id, pilote_id) VALUES (?, ?, ?, ?, ?, ?, ?)", messages)
+            # --- Table: Messagerie ---
+            messages = [
+                (1, '2026-01-09', '11:25', 'Bonjour, je confirme ma réservation pour le 10.', 1, 1, 1),
+                (2, '2026-01-09', '11:30', 'Bien reçu, votre hangar est réservé.', 0, 1, 1)
+            ]
+            _insert_rows(cursor, "Messagerie", "Id, date, heure, contenu, sens_d_envoie, agent_id, pilote_id", messages)
+
+            # Recréer les index secondaires sur les tables remplies
+            for _, index_sql in secondary_indexes:
+                cursor.execute(index_sql)
 
+            # Met à jour les statistiques des index maintenant que les tables sont remplies
+            cursor.execute("ANALYZE;")
 
-        conn.commit()
         print("Base de données remplie avec succès.")
 
     except sqlite3.Error as e:
+        # La transaction a déjà été annulée par le bloc "with conn"
         print(f"Erreur SQLite lors du remplissage : {e}")
-        if 'conn' in locals() and conn:
-            conn.rollback()
     finally:
-        if 'conn' in locals() and conn:
+        if owns_conn and conn:
             conn.close()
 
 if __name__ == "__main__":
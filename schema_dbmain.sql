@@ -105,3 +105,43 @@ CREATE TABLE Creneaux (
                 FOREIGN KEY (infrastructure_id) REFERENCES Infrastructure(Id) ON DELETE SET NULL
             );
 
+-- Indexes
+CREATE INDEX idx_creneaux_infra_time ON Creneaux (infrastructure_id, debut_prevu, fin_prevu);
+CREATE INDEX idx_avion_pilote ON Avion (pilote_id);
+CREATE INDEX idx_avitaillement_avion ON Avitaillement (avion_id);
+CREATE INDEX idx_creneaux_pilote ON Creneaux (pilote_id);
+CREATE INDEX idx_creneaux_avion ON Creneaux (avion_id);
+CREATE INDEX idx_creneaux_avitaillement ON Creneaux (avitaillement_id);
+CREATE INDEX idx_messagerie_pilote ON Messagerie (pilote_id);
+CREATE INDEX idx_messagerie_agent ON Messagerie (agent_id);
+
+-- Triggers
+CREATE TRIGGER trg_creneaux_no_overlap_insert
+BEFORE INSERT ON Creneaux
+BEGIN
+    SELECT RAISE(ABORT, 'End time must be after start time')
+    WHERE datetime(NEW.fin_prevu) <= datetime(NEW.debut_prevu);
+    SELECT RAISE(ABORT, 'Time slot conflicts with an existing slot. Minimum 90-minute gap required.')
+    WHERE EXISTS (
+        SELECT 1 FROM Creneaux
+        WHERE infrastructure_id = NEW.infrastructure_id
+          AND debut_prevu < datetime(NEW.fin_prevu, '+90 minutes')
+          AND fin_prevu > datetime(NEW.debut_prevu, '-90 minutes')
+          AND Id IS NOT NEW.Id
+    );
+END;
+
+CREATE TRIGGER trg_creneaux_no_overlap_update
+BEFORE UPDATE OF debut_prevu, fin_prevu, infrastructure_id ON Creneaux
+BEGIN
+    SELECT RAISE(ABORT, 'End time must be after start time')
+    WHERE datetime(NEW.fin_prevu) <= datetime(NEW.debut_prevu);
+    SELECT RAISE(ABORT, 'Time slot conflicts with an existing slot. Minimum 90-minute gap required.')
+    WHERE EXISTS (
+        SELECT 1 FROM Creneaux
+        WHERE infrastructure_id = NEW.infrastructure_id
+          AND debut_prevu < datetime(NEW.fin_prevu, '+90 minutes')
+          AND fin_prevu > datetime(NEW.debut_prevu, '-90 minutes')
+          AND Id <> OLD.Id
+    );
+END;